@@ -1,28 +1,106 @@
-from flask import Flask
+from flask import Flask, g, request
 from flask_restful import Api
 
-from config import *
-from resources.game.detail import GameDetailResource
-from resources.game.list import GameListResource
-from resources.game.similar import GameSimilarResource
+from config import (
+    get_admission_limits, get_compression, get_document_store_path, get_entity_cache_size, get_entity_cache_ttl,
+    get_neo4j_read_urls, get_neo4j_url, get_preload, get_snapshot_path, get_warmup_paths
+)
+from services.admission_services import AdmissionService
+from services.cache_services import entity_cache
+from services.compression_services import CompressionService
+from services.database_services import DatabaseService
+from services.startup_services import StartupService, lazy_resource
+
+BOOKMARK_HEADER = "X-Bookmark"
+SNAPSHOT_ROUTES = ("/games", "/games/<string:node_id>", "/games/similar/<string:node_id>")
+# resources are imported on their first request, or all at once before forking with PRELOAD
+ROUTES = {
+    "/games": "resources.game.list.GameListResource",
+    "/games/timeline": "resources.game.timeline.GameTimelineResource",
+    "/games/<string:node_id>": "resources.game.detail.GameDetailResource",
+    "/games/similar/<string:node_id>": "resources.game.similar.GameSimilarResource",
+    "/games/<string:node_id>/dlcs": "resources.game.dlcs.GameDLCListResource",
+    "/dlcs/<string:node_id>": "resources.dlc.detail.DLCDetailResource",
+    "/companies": "resources.entity.list.CompanyListResource",
+    "/companies/<string:node_id>": "resources.entity.detail.CompanyDetailResource",
+    "/companies/<string:node_id>/games": "resources.entity.games.CompanyGameListResource",
+    "/genres": "resources.entity.list.GenreListResource",
+    "/genres/<string:node_id>": "resources.entity.detail.GenreDetailResource",
+    "/genres/<string:node_id>/games": "resources.entity.games.GenreGameListResource",
+    "/categories": "resources.entity.list.CategoryListResource",
+    "/categories/<string:node_id>": "resources.entity.detail.CategoryDetailResource",
+    "/categories/<string:node_id>/games": "resources.entity.games.CategoryGameListResource"
+}
 
 
 def create_app():
-    ROUTES = {
-        "/games": GameListResource,
-        "/games/<string:node_id>": GameDetailResource,
-        "/games/similar/<string:node_id>": GameSimilarResource
-    }
+    routes = ROUTES
 
     app = Flask(__name__, instance_relative_config=True)
     api = Api(app)
-    config.DATABASE_URL = get_neo4j_url()
+    entity_cache.configure(get_entity_cache_size(), get_entity_cache_ttl())
+    AdmissionService.configure(get_admission_limits())
+    CompressionService.configure(**get_compression())
+    if get_snapshot_path():
+        from services.model_services import ModelService
+        from services.snapshot_services import SnapshotBackend
+
+        # read-only deployment: no Neo4j, only the game endpoints served from the snapshot
+        ModelService.use_backend(SnapshotBackend(get_snapshot_path()))
+        routes = {route: ROUTES[route] for route in SNAPSHOT_ROUTES}
+    else:
+        DatabaseService.configure(get_neo4j_url(), get_neo4j_read_urls())
+        if get_document_store_path():
+            from services.document_services import DocumentService
+
+            DocumentService.configure(get_document_store_path())
+
+    if get_preload():
+        StartupService.preload(routes)
+    for route, path in routes.items():
+        api.add_resource(lazy_resource(path), route, endpoint=path)
+
+    # before admit: a rejected request must not answer with the bookmarks of the previous one
+    @app.before_request
+    def set_bookmarks():
+        DatabaseService.set_bookmarks(request.headers.get(BOOKMARK_HEADER, "").split(","))
+
+    @app.before_request
+    def admit():
+        if request.endpoint not in ROUTES.values():
+            return None
+        name = request.endpoint.rpartition(".")[2]
+        cost = AdmissionService.get_cost(name, request.args.get("start", 0, type=int))
+        rejection = AdmissionService.admit(name, cost)
+        if rejection:
+            status, retry_after = rejection
+            return {"message": "Too many requests, retry later"}, status, {"Retry-After": str(retry_after)}
+        g.admitted = name
+        return None
+
+    @app.teardown_request
+    def release(e=None):
+        if "admitted" in g:
+            AdmissionService.release(g.pop("admitted"))
+
+    @app.after_request
+    def add_bookmark(response):
+        bookmarks = DatabaseService.get_bookmarks()
+        if bookmarks:
+            response.headers[BOOKMARK_HEADER] = ",".join(bookmarks)
+        return response
 
-    for route, resource in ROUTES.items():
-        api.add_resource(resource, route)
+    @app.after_request
+    def compress(response):
+        return CompressionService.compress_response(request, response)
 
     @app.errorhandler(404)
     def error(e):
         return {"message": str(e)}, 404
 
+    if get_snapshot_path() or DatabaseService.is_reachable():
+        StartupService.warm_up(app, get_warmup_paths())
+    else:
+        # the driver would retry every warm-up query for up to 30 s
+        app.logger.warning("Neo4j is not reachable, skipping the warm-up")
     return app
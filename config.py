@@ -2,13 +2,98 @@ import os
 
 LOADING_FOLDER = r"C:\Shlack\python\games\loading\apps"
 DEFAULT_DB_USERNAME = "neo4j"
+DEFAULT_DB_PORT = 7687
+# admission per resource class: tokens per second, bucket size, requests in flight
+# and the start offset adding one token to the cost of a page
+ADMISSION_LIMITS = {
+    "GameSimilarResource": {"rate": 20, "burst": 40, "concurrency": 4},
+    "GameListResource": {"rate": 200, "burst": 400, "concurrency": 16, "offset_cost": 1000},
+}
 
+# media ids "prefix:path" are expanded to urls with these templates
+MEDIA_PREFIXES = {
+    "steam": "https://cdn.akamai.steamstatic.com/steam/apps/{path}",
+    "steamvideo": "http://cdn.akamai.steamstatic.com/steam/apps/{path}",
+}
 
-def get_neo4j_url(username=DEFAULT_DB_USERNAME):
-    host = os.environ.get("DB_HOST", "localhost")
-    port = 7687
+# responses under threshold bytes are not compressed, the ones over stream_threshold are compressed while sent
+COMPRESSION = {
+    "threshold": 1024,
+    "stream_threshold": 256 * 1024,
+    "gzip_level": 6,
+    "brotli_level": 5,
+    "cache_size": 256,
+}
+
+
+def get_neo4j_url(username=DEFAULT_DB_USERNAME, host=None):
+    """
+    Url of the instance that accepts writes (the leader).
+
+    With DB_ROUTING set the url uses the neo4j:// scheme,
+    so the driver itself routes reads and writes across the cluster.
+    """
+    host = host or os.environ.get("DB_HOST", "localhost")
+    if ":" not in host:
+        host = f"{host}:{DEFAULT_DB_PORT}"
+    scheme = "neo4j" if os.environ.get("DB_ROUTING") else "bolt"
     password = os.environ.get("DB_PASSWORD", "password")
-    return f"bolt://{username}:{password}@{host}:{port}/"
+    return f"{scheme}://{username}:{password}@{host}/"
+
+
+def get_neo4j_read_urls(username=DEFAULT_DB_USERNAME):
+    """
+    Urls of the read replicas, taken from the comma separated DB_READ_HOSTS
+    (host or host:port, so several local instances can be used for testing).
+    Falls back to the write url when no replicas are configured.
+    """
+    hosts = [host.strip() for host in os.environ.get("DB_READ_HOSTS", "").split(",") if host.strip()]
+    if not hosts:
+        return [get_neo4j_url(username)]
+    return [get_neo4j_url(username, host) for host in hosts]
+
+
+def get_document_store_path():
+    """Path of the materialised game documents file, the projection is off when it is not set."""
+    return os.environ.get("DOCUMENT_STORE_PATH")
+
+
+def get_snapshot_path():
+    """Path of a catalogue snapshot; when set the game endpoints are served from it without Neo4j."""
+    return os.environ.get("SNAPSHOT_PATH")
+
+
+def get_entity_cache_size():
+    """Number of serialized entities each worker keeps in its LRU, the entity cache is off when it is 0."""
+    return int(os.environ.get("ENTITY_CACHE_SIZE", 0))
+
+
+def get_entity_cache_ttl():
+    """Seconds an entity stays cached, bounds how long writes of other processes go unseen."""
+    return int(os.environ.get("ENTITY_CACHE_TTL", 60))
+
+
+def get_preload():
+    """Set when the app is created once before forking the workers (gunicorn --preload)."""
+    return bool(os.environ.get("PRELOAD"))
+
+
+def get_warmup_paths():
+    """Comma separated paths served once by create_app, so the first request is not a cold one."""
+    return [path.strip() for path in os.environ.get("WARMUP_PATHS", "/games?limit=10").split(",") if path.strip()]
+
+
+def get_admission_limits():
+    """ADMISSION_LIMITS, off when ADMISSION_OFF is set."""
+    return {} if os.environ.get("ADMISSION_OFF") else ADMISSION_LIMITS
+
+
+def get_media_prefixes():
+    return MEDIA_PREFIXES
+
+
+def get_compression():
+    return COMPRESSION
 
 
 def get_api_url():
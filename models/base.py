@@ -4,6 +4,8 @@ from abc import abstractmethod
 
 
 class BaseModel:
+    __slots__ = ()
+
     NAME = "BaseModel"
     DATE_FORMAT = "%d %b, %Y"
 
@@ -9,7 +9,7 @@ class Content(Entity):
     is_free = BooleanProperty(required=True)
     short_desc = StringProperty(required=True)
     long_desc = StringProperty(required=True)
-    date = DateProperty()
+    date = DateProperty(index=True)
 
     header_image = StringProperty(required=True)
     images = ArrayProperty()
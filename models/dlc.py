@@ -1,5 +1,9 @@
+from neomodel import RelationshipFrom
+
 from models.content import Content
 
 
 class DLC(Content):
     NAME = "DLC"
+
+    games = RelationshipFrom("models.game.Game", "DLC_OF")
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Mapping, Optional, Type
+
+from models.base import BaseModel
+
+
+class EntityRecord(BaseModel):
+    """
+    Read-only counterpart of Entity.
+
+    Built straight from a Cypher node instead of inflating a StructuredNode,
+    so it carries no property descriptors or relationship managers.
+    Connections are attached by ModelService in a single batched query.
+    """
+    NAME = "Entity"
+    LABEL = "Entity"
+    # (serialization key, relationship type, label of the connected node)
+    CONNECTIONS = ()
+    # serialization key: relationship types counted by node degree
+    COUNTS = {}
+
+    __slots__ = ("id", "node_id", "name", "connections", "counts")
+
+    def __init__(self, id: int = None, node_id: str = None, name: str = None, **_):
+        self.id = id
+        self.node_id = node_id
+        self.name = name
+        self.connections: Optional[Dict[str, List[EntityRecord]]] = None
+        self.counts: Optional[Dict[str, int]] = None
+
+    def __str__(self):
+        return self.name
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.node_id}: {self.name}>"
+
+    @classmethod
+    def from_node(cls, node: Mapping) -> EntityRecord:
+        return cls(id=getattr(node, "id", None), **dict(node))
+
+    @classmethod
+    def from_document(cls, document: Mapping) -> EntityRecord:
+        """Rebuilds a record from its own serialization, connections included."""
+        record = cls(**{key: value for key, value in document.items() if key != "connections"})
+        if "connections" in document:
+            record.connections = {
+                key: [
+                    RECORDS_BY_LABEL[label].from_document(connected)
+                    for connected in document["connections"].get(key, [])
+                ]
+                for key, _, label in cls.CONNECTIONS
+            }
+        return record
+
+    def serialize(self, connections: bool = False) -> dict:
+        serialization = {
+            "name": self.name,
+            "node_id": self.node_id
+        }
+        if self.counts:
+            serialization.update(self.counts)
+        if connections:
+            serialization.update({
+                "connections": self.serialize_connections()
+            })
+
+        return serialization
+
+    def serialize_connections(self) -> dict:
+        if self.connections is None:
+            raise ValueError(f"Connections of {self!r} were not loaded")
+
+        return {
+            key: [node.serialize() for node in self.connections.get(key, [])]
+            for key, _, _ in self.CONNECTIONS
+        }
+
+
+class CompanyRecord(EntityRecord):
+    NAME = "Company"
+    LABEL = "Company"
+
+    # a degree: games and DLCs, content both developed and published by the company is counted twice
+    COUNTS = {
+        "relationship_count": ("DEVELOPED", "PUBLISHED"),
+    }
+
+    __slots__ = ()
+
+
+class GenreRecord(EntityRecord):
+    NAME = "genre"
+    LABEL = "Genre"
+
+    COUNTS = {
+        "game_count": ("GENRE_OF",),
+    }
+
+    __slots__ = ()
+
+
+class CategoryRecord(EntityRecord):
+    NAME = "Category"
+    LABEL = "Category"
+
+    COUNTS = {
+        "game_count": ("CATEGORY_OF",),
+    }
+
+    __slots__ = ()
+
+
+class ContentRecord(EntityRecord):
+    NAME = "Content"
+    LABEL = "Content"
+    STORED_DATE_FORMAT = "%Y-%m-%d"
+    CONNECTIONS = (
+        ("developers", "DEVELOPED", "Company"),
+        ("publishers", "PUBLISHED", "Company"),
+    )
+
+    __slots__ = ("is_free", "short_desc", "long_desc", "date", "header_image", "images", "movies")
+
+    def __init__(
+            self,
+            is_free: bool = None, short_desc: str = None, long_desc: str = None, date=None,
+            header_image: str = None, images: List[str] = None, movies: List[str] = None,
+            **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.is_free = is_free
+        self.short_desc = short_desc
+        self.long_desc = long_desc
+        self.date = date
+        self.header_image = header_image
+        self.images = images
+        self.movies = movies
+
+    @classmethod
+    def from_document(cls, document: Mapping) -> ContentRecord:
+        record = super().from_document(document)
+        if record.date:
+            record.date = datetime.strptime(record.date, cls.DATE_FORMAT).date()
+        return record
+
+    def get_formatted_date(self):
+        if not self.date:
+            return None
+
+        if isinstance(self.date, str):
+            value = datetime.strptime(self.date, self.STORED_DATE_FORMAT)
+        else:
+            value = self.date
+        return value.strftime(self.DATE_FORMAT)
+
+    def serialize(self, connections: bool = False) -> dict:
+        serialization = super().serialize(connections=connections)
+
+        serialization.update({
+            "is_free": self.is_free,
+            "long_desc": self.long_desc,
+            "short_desc": self.short_desc,
+            "date": self.get_formatted_date(),
+            "header_image": self.header_image,
+            "images": self.images,
+            "movies": self.movies,
+        })
+        return serialization
+
+
+class DLCRecord(ContentRecord):
+    NAME = "DLC"
+    LABEL = "DLC"
+    CONNECTIONS = ContentRecord.CONNECTIONS + (
+        ("games", "DLC_OF", "Game"),
+    )
+
+    __slots__ = ()
+
+
+class GameRecord(ContentRecord):
+    NAME = "Game"
+    LABEL = "Game"
+    CONNECTIONS = (
+        ("genres", "GENRE_OF", "Genre"),
+        ("categories", "CATEGORY_OF", "Category"),
+        ("developers", "DEVELOPED", "Company"),
+        ("publishers", "PUBLISHED", "Company"),
+        ("dlcs", "DLC_OF", "DLC"),
+    )
+    COUNTS = {
+        "dlc_count": ("DLC_OF",),
+    }
+
+    __slots__ = ()
+
+
+# Most specific labels go first: a Game node is also labeled Content and Entity
+RECORD_CLASSES = (
+    GameRecord,
+    DLCRecord,
+    ContentRecord,
+    CompanyRecord,
+    GenreRecord,
+    CategoryRecord,
+    EntityRecord,
+)
+RECORDS_BY_LABEL = {record_cls.LABEL: record_cls for record_cls in RECORD_CLASSES}
+
+
+def get_record_class(labels: Iterable[str]) -> Type[EntityRecord]:
+    labels = set(labels)
+    for record_cls in RECORD_CLASSES:
+        if record_cls.LABEL in labels:
+            return record_cls
+    return EntityRecord
+
+
+def inflate_record(node) -> EntityRecord:
+    return get_record_class(getattr(node, "labels", ())).from_node(node)
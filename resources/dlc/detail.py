@@ -0,0 +1,23 @@
+from flask import request
+from flask_restful import Resource, abort
+
+from models.dlc import DLC
+from services.media_services import MediaService
+from services.model_services import ModelService, ModelNotFoundException
+
+
+class DLCDetailResource(Resource):
+    def get(self, node_id):
+        try:
+            instance = ModelService.get_model(
+                DLC,
+                connections=True,
+                node_id=node_id
+            )
+            return {
+                "result": MediaService.serialize(
+                    [instance.serialize(connections=True)], request.args.get("media", "id")
+                )[0]
+            }
+        except ModelNotFoundException:
+            abort(404)
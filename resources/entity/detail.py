@@ -0,0 +1,37 @@
+from flask_restful import Resource, abort
+
+from models.category import Category
+from models.company import Company
+from models.genre import Genre
+from services.model_services import ModelService, ModelNotFoundException
+
+
+class EntityDetailResource(Resource):
+    model_cls = None
+    COUNTS = ("game_count",)
+
+    def get(self, node_id):
+        try:
+            instance = ModelService.get_model(
+                self.model_cls,
+                counts=self.COUNTS,
+                node_id=node_id
+            )
+            return {
+                "result": instance.serialize()
+            }
+        except ModelNotFoundException:
+            abort(404)
+
+
+class CompanyDetailResource(EntityDetailResource):
+    model_cls = Company
+    COUNTS = ("relationship_count",)
+
+
+class GenreDetailResource(EntityDetailResource):
+    model_cls = Genre
+
+
+class CategoryDetailResource(EntityDetailResource):
+    model_cls = Category
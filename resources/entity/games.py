@@ -0,0 +1,85 @@
+from flask import request
+from flask_restful import Resource, reqparse, abort
+
+from models.category import Category
+from models.company import Company
+from models.game import Game
+from models.genre import Genre
+from services.media_services import MEDIA_CHOICES, MediaService
+from services.model_services import ModelService, ModelNotFoundException
+from services.pagination_services import PaginationService
+
+
+class EntityGameListResource(Resource):
+    model_cls = None
+
+    DEFAULT_LIMIT = 10
+    DEFAULT_SORT = "name"
+    GET_PARAMS = {
+        "start": {
+            "default": 0,
+            "type": int
+        },
+        "limit": {
+            "default": DEFAULT_LIMIT,
+            "type": int
+        },
+        "sort": {
+            "default": DEFAULT_SORT,
+            "type": str,
+            "choices": ("name", "-name", "date", "-date")
+        },
+        "media": {
+            "default": "id",
+            "type": str,
+            "choices": MEDIA_CHOICES
+        }
+    }
+
+    def get(self, node_id):
+        parser = reqparse.RequestParser()
+        for name, value in self.GET_PARAMS.items():
+            parser.add_argument(name, location="args", **value)
+        args = parser.parse_args()
+
+        try:
+            ModelService.get_model(
+                self.model_cls,
+                node_id=node_id
+            )
+
+            list_, is_next = ModelService.get_related_list(
+                model_cls=self.model_cls,
+                node_id=node_id,
+                related_cls=Game,
+                start=args.get("start"),
+                limit=args.get("limit"),
+                order_by=args.get("sort"),
+                connections=True
+            )
+
+            return PaginationService.get_paginated_list(
+                list_=MediaService.serialize(
+                    [instance.serialize(connections=True) for instance in list_], args.get("media")
+                ),
+                url=request.base_url,
+                is_next=is_next,
+                start=args.get("start"),
+                limit=args.get("limit"),
+                params={key: value for key, value in request.args.items() if key not in ("start", "limit")}
+            )
+
+        except ModelNotFoundException:
+            abort(404)
+
+
+class CompanyGameListResource(EntityGameListResource):
+    model_cls = Company
+
+
+class GenreGameListResource(EntityGameListResource):
+    model_cls = Genre
+
+
+class CategoryGameListResource(EntityGameListResource):
+    model_cls = Category
@@ -0,0 +1,98 @@
+from flask import request
+from flask_restful import Resource, reqparse
+
+from models.category import Category
+from models.company import Company
+from models.genre import Genre
+from services.cache_services import list_cache
+from services.model_services import ModelService
+from services.pagination_services import PaginationService
+
+
+class EntityListResource(Resource):
+    model_cls = None
+    # small lists are kept entirely in memory and paginated from there
+    cached = False
+
+    DEFAULT_LIMIT = 10
+    DEFAULT_SORT = "-game_count"
+    COUNTS = ("game_count",)
+    GET_PARAMS = {
+        "start": {
+            "default": 0,
+            "type": int
+        },
+        "limit": {
+            "default": DEFAULT_LIMIT,
+            "type": int
+        },
+        "sort": {
+            "default": DEFAULT_SORT,
+            "type": str,
+            "choices": ("name", "-name", "game_count", "-game_count")
+        }
+    }
+
+    def get(self):
+        parser = reqparse.RequestParser()
+
+        for name, value in self.GET_PARAMS.items():
+            parser.add_argument(name, location="args", **value)
+
+        args = parser.parse_args()
+        start, limit = args.get("start"), min(args.get("limit"), PaginationService.MAX_LIMIT)
+
+        if self.cached:
+            full_list = list_cache.get_or_load(
+                f"{self.model_cls.__label__}:{args.get('sort')}",
+                [self.model_cls.__label__],
+                lambda: [
+                    instance.serialize() for instance in ModelService.get_filtered_list(
+                        model_cls=self.model_cls,
+                        order_by=args.get("sort"),
+                        counts=self.COUNTS
+                    )[0]
+                ]
+            )
+            list_ = PaginationService.trim_list(full_list, start, limit)
+            is_next = start + limit < len(full_list)
+        else:
+            instances, is_next = ModelService.get_filtered_list(
+                model_cls=self.model_cls,
+                start=start,
+                limit=limit,
+                order_by=args.get("sort"),
+                counts=self.COUNTS
+            )
+            list_ = [instance.serialize() for instance in instances]
+
+        return PaginationService.get_paginated_list(
+            list_=list_,
+            url=request.base_url,
+            is_next=is_next,
+            start=start,
+            limit=limit,
+            params={key: value for key, value in request.args.items() if key not in ("start", "limit")}
+        )
+
+
+class CompanyListResource(EntityListResource):
+    model_cls = Company
+
+    DEFAULT_SORT = "-relationship_count"
+    COUNTS = ("relationship_count",)
+    GET_PARAMS = dict(EntityListResource.GET_PARAMS, sort={
+        "default": DEFAULT_SORT,
+        "type": str,
+        "choices": ("name", "-name", "relationship_count", "-relationship_count")
+    })
+
+
+class GenreListResource(EntityListResource):
+    model_cls = Genre
+    cached = True
+
+
+class CategoryListResource(EntityListResource):
+    model_cls = Category
+    cached = True
@@ -1,18 +1,17 @@
+from flask import request
 from flask_restful import Resource, abort
 
-from models.game import Game
-from services.model_services import ModelService, ModelNotFoundException
+from services.document_services import DocumentService
+from services.media_services import MediaService
+from services.model_services import ModelNotFoundException
 
 
 class GameDetailResource(Resource):
     def get(self, node_id):
         try:
-            instance = ModelService.get_model(
-                Game,
-                node_id=node_id
-            )
+            document = DocumentService.get_document(node_id, connections=False)
             return {
-                "result": instance.serialize()
+                "result": MediaService.serialize([document], request.args.get("media", "id"))[0]
             }
         except ModelNotFoundException:
             abort(404)
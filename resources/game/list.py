@@ -1,11 +1,20 @@
+from datetime import date, datetime
+
 from flask import request
 from flask_restful import Resource, reqparse
 
 from models.game import Game
+from models.records import GameRecord
+from services.document_services import DocumentService
+from services.media_services import MEDIA_CHOICES, MediaService
 from services.model_services import ModelService
 from services.pagination_services import PaginationService
 
 
+def iso_date(value: str) -> date:
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
 class GameListResource(Resource):
     DEFAULT_LIMIT = 10
     DEFAULT_SORT = "-name"
@@ -20,29 +29,63 @@ class GameListResource(Resource):
         },
         "sort": {
             "default": DEFAULT_SORT,
-            "type": str
+            "type": str,
+            "choices": tuple(
+                f"{sign}{key}" for key in ("name", "date", *GameRecord.COUNTS) for sign in ("", "-")
+            )
+        },
+        "released_after": {
+            "default": None,
+            "type": iso_date
+        },
+        "released_before": {
+            "default": None,
+            "type": iso_date
+        },
+        "expand": {
+            "default": [],
+            "type": str,
+            "action": "append",
+            "choices": tuple(GameRecord.COUNTS)
+        },
+        "media": {
+            "default": "id",
+            "type": str,
+            "choices": MEDIA_CHOICES
         }
     }
+    DATE_FILTERS = {
+        "released_after": "date__gte",
+        "released_before": "date__lte",
+    }
 
     def get(self):
         parser = reqparse.RequestParser()
 
         for name, value in self.GET_PARAMS.items():
-            parser.add_argument(name, default=value["default"], type=value["type"], location="args")
+            parser.add_argument(name, location="args", **value)
 
         args = parser.parse_args()
+        filters = {
+            lookup: args.get(name)
+            for name, lookup in self.DATE_FILTERS.items()
+            if args.get(name)
+        }
 
         list_, is_next = ModelService.get_filtered_list(
             model_cls=Game,
             start=args.get("start"),
             limit=args.get("limit"),
-            order_by=args.get("sort")
+            order_by=args.get("sort"),
+            counts=tuple(args.get("expand")),
+            **filters
         )
 
         return PaginationService.get_paginated_list(
-            list_=[instance.serialize(connections=True) for instance in list_],
+            list_=MediaService.serialize(DocumentService.get_documents(list_), args.get("media")),
             url=request.base_url,
             is_next=is_next,
             start=args.get("start"),
-            limit=args.get("limit")
+            limit=args.get("limit"),
+            params={key: value for key, value in request.args.items() if key not in ("start", "limit")}
         )
\ No newline at end of file
@@ -2,6 +2,8 @@ from flask import request
 from flask_restful import Resource, reqparse, abort
 
 from models.game import Game
+from services.document_services import DocumentService
+from services.media_services import MEDIA_CHOICES, MediaService
 from services.model_services import ModelService, ModelNotFoundException
 from services.pagination_services import PaginationService
 
@@ -16,13 +18,18 @@ class GameSimilarResource(Resource):
         "limit": {
             "default": DEFAULT_LIMIT,
             "type": int
+        },
+        "media": {
+            "default": "id",
+            "type": str,
+            "choices": MEDIA_CHOICES
         }
     }
 
     def get(self, node_id):
         parser = reqparse.RequestParser()
         for name, value in self.GET_PARAMS.items():
-            parser.add_argument(name, default=value["default"], type=value["type"], location="args")
+            parser.add_argument(name, location="args", **value)
         args = parser.parse_args()
 
         try:
@@ -35,15 +42,16 @@ class GameSimilarResource(Resource):
                 model_cls=Game,
                 name=instance.name,
                 start=args.get("start"),
-                limit=args.get("limit")
+                limit=args.get("limit"),
             )
 
             return PaginationService.get_paginated_list(
-                list_=[instance.serialize(connections=True) for instance in list_],
+                list_=MediaService.serialize(DocumentService.get_documents(list_), args.get("media")),
                 url=request.base_url,
                 is_next=is_next,
                 start=args.get("start"),
-                limit=args.get("limit")
+                limit=args.get("limit"),
+                params={key: value for key, value in request.args.items() if key not in ("start", "limit")}
             )
 
         except ModelNotFoundException:
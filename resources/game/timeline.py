@@ -0,0 +1,48 @@
+from flask_restful import Resource, reqparse
+
+from models.game import Game
+from resources.game.list import iso_date, GameListResource
+from services.model_services import ModelService
+
+
+class GameTimelineResource(Resource):
+    DEFAULT_PERIOD = "month"
+    GET_PARAMS = {
+        "period": {
+            "default": DEFAULT_PERIOD,
+            "type": str,
+            "choices": ("month", "year")
+        },
+        "released_after": {
+            "default": None,
+            "type": iso_date
+        },
+        "released_before": {
+            "default": None,
+            "type": iso_date
+        }
+    }
+
+    def get(self):
+        parser = reqparse.RequestParser()
+
+        for name, value in self.GET_PARAMS.items():
+            parser.add_argument(name, location="args", **value)
+
+        args = parser.parse_args()
+        filters = {
+            lookup: args.get(name)
+            for name, lookup in GameListResource.DATE_FILTERS.items()
+            if args.get(name)
+        }
+
+        timeline, undated = ModelService.get_timeline(
+            model_cls=Game,
+            period=args.get("period"),
+            **filters
+        )
+
+        return {
+            "results": timeline,
+            "undated": undated
+        }
@@ -0,0 +1,123 @@
+import math
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+
+class TokenBucket:
+    """Refills rate tokens per second up to burst, a request takes as many tokens as it costs."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self, cost: float = 1) -> float:
+        """Takes cost tokens and returns 0, or returns the seconds until they are there without taking any."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # a request costing more than the burst is let through when the bucket is full
+            cost = min(cost, self.burst)
+            if self._tokens >= cost:
+                self._tokens -= cost
+                return 0
+            return (cost - self._tokens) / self.rate
+
+
+class ConcurrencyLimiter:
+    """Counts requests in flight, never waits for a free slot."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        with self._lock:
+            if self._active >= self.limit:
+                return False
+            self._active += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self._active -= 1
+
+
+class AdmissionService:
+    """
+    Cost-based admission per resource class: a request is either admitted right away
+    or rejected with the status and Retry-After to answer, so an expensive endpoint
+    under a burst does not queue requests in front of the cheap ones.
+    A request costs 1 token plus 1 per offset_cost rows skipped by its start.
+    """
+    RATE_LIMITED = 429
+    OVERLOADED = 503
+
+    _limits: Dict[str, dict] = {}
+    _buckets: Dict[str, TokenBucket] = {}
+    _limiters: Dict[str, ConcurrencyLimiter] = {}
+    _stats: Dict[str, Dict[str, int]] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def configure(limits: Dict[str, dict]) -> None:
+        """limits: resource class name -> {"rate", "burst", "concurrency", "offset_cost"}, each one optional."""
+        AdmissionService._limits = dict(limits)
+        AdmissionService._buckets = {
+            name: TokenBucket(limit["rate"], limit.get("burst", limit["rate"]))
+            for name, limit in limits.items() if limit.get("rate")
+        }
+        AdmissionService._limiters = {
+            name: ConcurrencyLimiter(limit["concurrency"])
+            for name, limit in limits.items() if limit.get("concurrency")
+        }
+        AdmissionService._stats = {}
+
+    @staticmethod
+    def get_cost(name: str, start: int = 0) -> int:
+        offset_cost = AdmissionService._limits.get(name, {}).get("offset_cost")
+        return 1 + (max(start, 0) // offset_cost if offset_cost else 0)
+
+    @staticmethod
+    def admit(name: str, cost: int = 1) -> Optional[Tuple[int, int]]:
+        """
+        None when the request is admitted, then release(name) has to follow it.
+        Otherwise the status and the Retry-After seconds of the rejection.
+        """
+        limiter = AdmissionService._limiters.get(name)
+        if limiter and not limiter.acquire():
+            AdmissionService._count(name, "overloaded")
+            return AdmissionService.OVERLOADED, 1
+
+        bucket = AdmissionService._buckets.get(name)
+        wait = bucket.take(cost) if bucket else 0
+        if wait:
+            if limiter:
+                limiter.release()
+            AdmissionService._count(name, "rate_limited")
+            return AdmissionService.RATE_LIMITED, math.ceil(wait)
+
+        AdmissionService._count(name, "served")
+        return None
+
+    @staticmethod
+    def release(name: str) -> None:
+        limiter = AdmissionService._limiters.get(name)
+        if limiter:
+            limiter.release()
+
+    @staticmethod
+    def get_stats() -> Dict[str, Dict[str, int]]:
+        with AdmissionService._lock:
+            return {name: dict(counts) for name, counts in AdmissionService._stats.items()}
+
+    @staticmethod
+    def _count(name: str, outcome: str) -> None:
+        with AdmissionService._lock:
+            counts = AdmissionService._stats.setdefault(name, {"served": 0, "rate_limited": 0, "overloaded": 0})
+            counts[outcome] += 1
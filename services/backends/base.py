@@ -0,0 +1,234 @@
+from abc import abstractmethod
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple, Type
+from uuid import uuid4
+
+from models.base import BaseModel
+from models.category import Category
+from models.company import Company
+from models.content import Content
+from models.dlc import DLC
+from models.entity import Entity
+from models.game import Game
+from models.genre import Genre
+from models.records import EntityRecord, get_record_class
+from services.media_services import MediaService
+
+
+class ModelNotFoundException(Exception):
+    pass
+
+
+class BaseBackend:
+    """
+    Storage behind ModelService. Read methods return records (models.records),
+    filters are neomodel-like lookups and payloads are the ones of create_model.
+    """
+    # payload key: (connected model, relationship type)
+    RELATIONSHIPS = {
+        "publishers": (Company, "PUBLISHED"),
+        "developers": (Company, "DEVELOPED"),
+        "genres": (Genre, "GENRE_OF"),
+        "categories": (Category, "CATEGORY_OF"),
+    }
+    # payload key: (connected model, relationship type) of relationships from connected nodes that have to exist
+    PARENT_RELATIONSHIPS = {
+        "games": (Game, "DLC_OF"),
+    }
+    OPERATORS = ("gt", "gte", "lt", "lte")
+
+    @abstractmethod
+    def get_model(
+            self,
+            model_cls: Type[Entity],
+            connections: bool = False,
+            counts: Tuple[str, ...] = (),
+            **kwargs
+    ) -> EntityRecord:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_filtered_list(
+            self,
+            model_cls: Type[Entity],
+            start: int = 0,
+            limit: int = None,
+            order_by="-name",
+            connections: bool = False,
+            counts: Tuple[str, ...] = (),
+            **kwargs
+    ) -> Tuple[List[BaseModel], bool]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_similar_list(
+            self,
+            model_cls: Type[Entity],
+            name: str,
+            start: int = 0,
+            limit: int = None,
+            connections: bool = False,
+            counts: Tuple[str, ...] = (),
+    ) -> Tuple[List[BaseModel], bool]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def create_model(self, model_cls: Type[Entity], **kwargs) -> BaseModel:
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_model(self, model_cls: Type[Entity], name: str) -> Optional[Tuple[str, List[Tuple[str, str, str]]]]:
+        """Returns node_id and relationships of the deleted node, None when there was no such node."""
+        raise NotImplementedError
+
+    def get_related_list(
+            self,
+            model_cls: Type[Entity],
+            node_id: str,
+            related_cls: Type[Entity],
+            start: int = 0,
+            limit: int = None,
+            order_by="name",
+            connections: bool = False,
+            counts: Tuple[str, ...] = (),
+    ) -> Tuple[List[BaseModel], bool]:
+        raise NotImplementedError
+
+    def get_timeline(self, model_cls: Type[Entity], period: str = "month", **kwargs) -> Tuple[List[dict], int]:
+        raise NotImplementedError
+
+    def attach_connections(self, records: List[EntityRecord]) -> None:
+        raise NotImplementedError
+
+    def create_many(
+            self,
+            model_cls: Type[Entity],
+            payloads: List[dict],
+            batch_size: int = None,
+            on_batch: Callable[[List[dict], List[str]], None] = None
+    ) -> List[str]:
+        """
+        Returns node ids in the order of payloads.
+        on_batch(payloads, node_ids) is called after each committed batch.
+        """
+        raise NotImplementedError
+
+    def _get_row(self, model_cls: Type[Entity], payload: dict) -> dict:
+        row_types = {
+            Entity: self._get_entity_row,
+            Company: self._get_entity_row,
+            Genre: self._get_entity_row,
+            Category: self._get_entity_row,
+            Content: self._get_content_row,
+            DLC: self._get_dlc_row,
+            Game: self._get_game_row,
+        }
+        method = row_types.get(model_cls)
+        if not method:
+            raise NotImplementedError
+        return method(model_cls, **payload)
+
+    def _get_order(self, model_cls: Type[Entity], order_by: str) -> Tuple[str, str]:
+        key, direction = (order_by[1:], "DESC") if order_by.startswith("-") else (order_by, "ASC")
+        if key in get_record_class([model_cls.__label__]).COUNTS:
+            return key, direction
+        if key not in model_cls.defined_properties(aliases=False, rels=False):
+            raise ValueError(f"No such property {key} on {model_cls.__name__}")
+        return key, direction
+
+    def _parse_filters(self, model_cls: Type[Entity], filters: dict) -> List[Tuple[str, str, object]]:
+        """Splits neomodel-like lookups into (property, operator, deflated value), the operator is "" for equality."""
+        properties = model_cls.defined_properties(aliases=False, rels=False)
+        parsed = []
+        for lookup, value in filters.items():
+            key, _, operator = lookup.partition("__")
+            if key not in properties:
+                raise ValueError(f"No such property {key} on {model_cls.__name__}")
+            if operator and operator not in self.OPERATORS:
+                raise ValueError(f"No such operator {operator}")
+            parsed.append((key, operator, properties[key].deflate(value) if value is not None else None))
+        return parsed
+
+    def _is_sparse_order(self, model_cls: Type[Entity], key: str, filters: dict) -> bool:
+        """Ordering by an indexed optional property puts the nodes without it last, ordered by name."""
+        prop = model_cls.defined_properties(aliases=False, rels=False)[key]
+        filtered = any(lookup.partition("__")[0] == key for lookup in filters)
+        return prop.index and not prop.required and not filtered
+
+    def _get_relation_types(self, model_cls: Type[Entity], related_cls: Type[Entity]) -> List[str]:
+        relation_types = []
+        for base_cls, connected_cls in ((model_cls, related_cls), (related_cls, model_cls)):
+            for _, relation_type, label in get_record_class([base_cls.__label__]).CONNECTIONS:
+                if label == connected_cls.__label__ and relation_type not in relation_types:
+                    relation_types.append(relation_type)
+        if not relation_types:
+            raise ValueError(f"{model_cls.__name__} is not connected to {related_cls.__name__}")
+        return relation_types
+
+    def get_relationships(self, model_cls: Type[Entity], payload: dict) -> List[Tuple[str, str, str]]:
+        return [
+            (relation_type, related_cls.__label__, related_name)
+            for key, (related_cls, relation_type) in {**self.RELATIONSHIPS, **self.PARENT_RELATIONSHIPS}.items()
+            if hasattr(model_cls, key)
+            for related_name in payload.get(key) or []
+        ]
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _parse_date(date: str, date_format: str):
+        try:
+            return datetime.strptime(date, date_format)
+        except ValueError:
+            return None
+
+    def _get_entity_row(self, model_cls: Type[Entity], name: str) -> dict:
+        return {
+            "name": name,
+            "node_id": uuid4().hex,
+            "properties": {},
+        }
+
+    def _get_content_row(
+            self,
+            model_cls: Type[Entity],
+            name: str, short_desc: str, long_desc: str, header_image: str,
+            is_free: bool = False, images: List[str] = None, movies: [List] = None,
+            publishers: List[str] = None, developers: List[str] = None, date=None,
+    ) -> dict:
+        if date:
+            date = self._parse_date(date, model_cls.DATE_FORMAT)
+
+        row = self._get_entity_row(model_cls, name)
+        row.update({
+            "publishers": publishers or [],
+            "developers": developers or [],
+        })
+        row["properties"].update({
+            "is_free": bool(is_free),
+            "short_desc": short_desc,
+            "long_desc": long_desc,
+            "header_image": MediaService.compact(header_image),
+            "images": MediaService.compact_many(images),
+            "movies": MediaService.compact_many(movies),
+            "date": date.date().isoformat() if date else None,
+        })
+        return row
+
+    def _get_dlc_row(self, model_cls: Type[Entity], games: List[str] = None, **kwargs) -> dict:
+        row = self._get_content_row(model_cls, **kwargs)
+        row["games"] = games or []
+        return row
+
+    def _get_game_row(
+            self,
+            model_cls: Type[Entity],
+            genres: List[str] = None, categories: List[str] = None,
+            **kwargs
+    ) -> dict:
+        row = self._get_content_row(model_cls, **kwargs)
+        row.update({
+            "genres": genres or [],
+            "categories": categories or [],
+        })
+        return row
@@ -0,0 +1,369 @@
+import itertools
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Type
+
+from models.base import BaseModel
+from models.entity import Entity
+from models.records import EntityRecord, get_record_class, inflate_record
+from services.backends.base import BaseBackend, ModelNotFoundException
+
+
+class _Node(dict):
+    """Properties of a stored node, shaped like a driver node so records inflate from it."""
+
+    def __init__(self, id_: int, labels: Iterable[str], **properties):
+        super().__init__(**properties)
+        self.id = id_
+        self.labels = frozenset(labels)
+
+
+class _Top:
+    """Sorts after any name, so (value, _TOP) bounds every entry having the value."""
+
+    def __lt__(self, other):
+        return False
+
+    def __gt__(self, other):
+        return True
+
+
+_TOP = _Top()
+
+
+class _Index:
+    """Sorted (value, name) keys of the nodes of a label having a property, with their node ids."""
+
+    def __init__(self, entries: Iterable[Tuple[object, str, str]]):
+        entries = sorted(entries)
+        self.keys = [(value, name) for value, name, _ in entries]
+        self.node_ids = [node_id for _, _, node_id in entries]
+
+    def add(self, value, name: str, node_id: str) -> None:
+        position = bisect_left(self.keys, (value, name))
+        self.keys.insert(position, (value, name))
+        self.node_ids.insert(position, node_id)
+
+    def remove(self, value, name: str, node_id: str) -> None:
+        # names are unique per label only: a Game and a DLC share the keys of a Content index
+        position = bisect_left(self.keys, (value, name))
+        while self.node_ids[position] != node_id:
+            position += 1
+        del self.keys[position]
+        del self.node_ids[position]
+
+    def find(self, operator: str, value) -> List[str]:
+        lower, upper = 0, len(self.keys)
+        if operator in ("", "gte"):
+            lower = bisect_left(self.keys, (value,))
+        elif operator == "gt":
+            lower = bisect_left(self.keys, (value, _TOP))
+        if operator in ("", "lte"):
+            upper = bisect_left(self.keys, (value, _TOP))
+        elif operator == "lt":
+            upper = bisect_left(self.keys, (value,))
+        return self.node_ids[lower:upper]
+
+
+class InMemoryBackend(BaseBackend):
+    """
+    Keeps the whole graph in process: nodes by node_id, node ids by label, undirected
+    adjacency sets and sorted per (label, property) indexes built on first use.
+    Orders, filters and similarity scores follow the Neo4j backend, so it stands in
+    for it in tests and small deployments.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._ids = itertools.count(1)
+        self._nodes: Dict[str, _Node] = {}
+        self._labels: Dict[str, Set[str]] = {}
+        self._edges: Dict[str, Set[Tuple[str, str]]] = {}
+        self._indexes: Dict[Tuple[str, str], _Index] = {}
+
+    def get_model(
+            self,
+            model_cls: Type[Entity],
+            connections: bool = False,
+            counts: Tuple[str, ...] = (),
+            **kwargs
+    ) -> EntityRecord:
+        with self._lock:
+            node_ids = self._find(model_cls, kwargs)
+            if not node_ids:
+                raise ModelNotFoundException
+            return self._get_records(node_ids[:1], connections, counts)[0]
+
+    def get_filtered_list(
+            self,
+            model_cls: Type[Entity],
+            start: int = 0,
+            limit: int = None,
+            order_by="-name",
+            connections: bool = False,
+            counts: Tuple[str, ...] = (),
+            **kwargs
+    ) -> Tuple[List[BaseModel], bool]:
+        with self._lock:
+            key, direction = self._get_order(model_cls, order_by)
+            node_ids = self._find(model_cls, kwargs) if kwargs else None
+            if key in get_record_class([model_cls.__label__]).COUNTS:
+                node_ids = self._order_by_degree(model_cls, key, direction, node_ids)
+            else:
+                node_ids = self._order(model_cls, key, direction, node_ids, self._is_sparse_order(model_cls, key, kwargs))
+            return self._get_page(node_ids, start, limit, connections, counts)
+
+    def get_related_list(
+            self,
+            model_cls: Type[Entity],
+            node_id: str,
+            related_cls: Type[Entity],
+            start: int = 0,
+            limit: int = None,
+            order_by="name",
+            connections: bool = False,
+            counts: Tuple[str, ...] = (),
+    ) -> Tuple[List[BaseModel], bool]:
+        with self._lock:
+            key, direction = self._get_order(related_cls, order_by)
+            relation_types = self._get_relation_types(model_cls, related_cls)
+            related = set()
+            if node_id in self._labels.get(model_cls.__label__, ()):
+                related = {
+                    other_id for relation_type, other_id in self._edges[node_id]
+                    if relation_type in relation_types and other_id in self._labels[related_cls.__label__]
+                }
+            node_ids = self._order(related_cls, key, direction, related, False)
+            return self._get_page(node_ids, start, limit, connections, counts)
+
+    def get_timeline(self, model_cls: Type[Entity], period: str = "month", **kwargs) -> Tuple[List[dict], int]:
+        periods = {"month": 7, "year": 4}
+        if period not in periods:
+            raise ValueError(f"No such period {period}")
+
+        with self._lock:
+            node_ids = self._find(model_cls, kwargs) if kwargs else self._labels.get(model_cls.__label__, set())
+            totals = {}
+            for node_id in node_ids:
+                date = self._nodes[node_id].get("date")
+                if date is not None:
+                    totals[date[:periods[period]]] = totals.get(date[:periods[period]], 0) + 1
+
+        timeline = [{"period": period_, "count": totals[period_]} for period_ in sorted(totals)]
+        undated = None if kwargs else len(node_ids) - sum(totals.values())
+        return timeline, undated
+
+    def get_similar_list(
+            self,
+            model_cls: Type[Entity],
+            name: str,
+            start: int = 0,
+            limit: int = None,
+            connections: bool = False,
+            counts: Tuple[str, ...] = (),
+    ) -> Tuple[List[BaseModel], bool]:
+        with self._lock:
+            base = self.get_model(model_cls, name=name).node_id
+            members = self._labels[model_cls.__label__]
+
+            # a similar node scores one per edge pair through a shared node, as the paths of the Cypher version
+            scores = {}
+            for _, connected in self._edges[base]:
+                for _, similar in self._edges[connected]:
+                    if similar != base and similar in members:
+                        scores[similar] = scores.get(similar, 0) + 1
+
+            node_ids = sorted(scores, key=lambda node_id: (-scores[node_id], self._nodes[node_id]["name"]))
+            return self._get_page(node_ids, start, limit, connections, counts)
+
+    def attach_connections(self, records: List[EntityRecord]) -> None:
+        with self._lock:
+            for record in records:
+                record.connections = {key: [] for key, _, _ in record.CONNECTIONS}
+                edges = self._edges.get(record.node_id, ())
+                for key, relation_type, label in record.CONNECTIONS:
+                    connected = [
+                        self._nodes[other_id] for type_, other_id in edges
+                        if type_ == relation_type and label in self._nodes[other_id].labels
+                    ]
+                    connected.sort(key=lambda node: node["name"])
+                    record.connections[key] = [inflate_record(node) for node in connected]
+
+    def create_model(self, model_cls: Type[Entity], **kwargs) -> EntityRecord:
+        with self._lock:
+            node_id = self._merge(model_cls, self._get_row(model_cls, kwargs))
+            return inflate_record(self._nodes[node_id])
+
+    def create_many(
+            self,
+            model_cls: Type[Entity],
+            payloads: List[dict],
+            batch_size: int = None,
+            on_batch: Callable[[List[dict], List[str]], None] = None
+    ) -> List[str]:
+        rows = [self._get_row(model_cls, payload) for payload in payloads]
+        with self._lock:
+            node_ids = [self._merge(model_cls, row) for row in rows]
+        # one batch: the nodes are written under one lock
+        if on_batch:
+            on_batch(payloads, node_ids)
+        return node_ids
+
+    def delete_model(self, model_cls: Type[Entity], name: str) -> Optional[Tuple[str, List[Tuple[str, str, str]]]]:
+        with self._lock:
+            node_ids = self._find(model_cls, {"name": name})
+            if not node_ids:
+                return None
+            node_id = node_ids[0]
+            node = self._nodes.pop(node_id)
+
+            relationships = []
+            for relation_type, other_id in self._edges.pop(node_id):
+                other = self._nodes[other_id]
+                self._edges[other_id].discard((relation_type, node_id))
+                relationships.append((relation_type, get_record_class(other.labels).LABEL, other["name"]))
+
+            for label in node.labels:
+                self._labels[label].discard(node_id)
+            for (label, key), index in self._indexes.items():
+                if label in node.labels and node.get(key) is not None:
+                    index.remove(node[key], node["name"], node_id)
+            return node_id, relationships
+
+    def _merge(self, model_cls: Type[Entity], row: dict) -> str:
+        """Creates the node of a row unless one with its name exists, then connects the related nodes."""
+        for key, (related_cls, _) in self.PARENT_RELATIONSHIPS.items():
+            for related_name in row.get(key) or []:
+                if not self._find(related_cls, {"name": related_name}):
+                    raise ModelNotFoundException(f"No {related_cls.__name__} {related_name} for {row['name']}")
+
+        node_ids = self._find(model_cls, {"name": row["name"]})
+        node_id = node_ids[0] if node_ids else self._add_node(model_cls, row)
+
+        # edges are undirected here, parents are connected like the merged nodes once they are found
+        for key, (related_cls, relation_type) in {**self.RELATIONSHIPS, **self.PARENT_RELATIONSHIPS}.items():
+            for related_name in row.get(key) or []:
+                related_ids = self._find(related_cls, {"name": related_name})
+                related_id = related_ids[0] if related_ids else self._add_node(
+                    related_cls, self._get_entity_row(related_cls, related_name)
+                )
+                self._edges[node_id].add((relation_type, related_id))
+                self._edges[related_id].add((relation_type, node_id))
+        return node_id
+
+    def _add_node(self, model_cls: Type[Entity], row: dict) -> str:
+        node = _Node(
+            next(self._ids), model_cls.inherited_labels(),
+            name=row["name"], node_id=row["node_id"], **row["properties"]
+        )
+        self._nodes[node["node_id"]] = node
+        self._edges[node["node_id"]] = set()
+        for label in node.labels:
+            self._labels.setdefault(label, set()).add(node["node_id"])
+        for (label, key), index in self._indexes.items():
+            if label in node.labels and node.get(key) is not None:
+                index.add(node[key], node["name"], node["node_id"])
+        return node["node_id"]
+
+    def _get_index(self, label: str, key: str) -> _Index:
+        index = self._indexes.get((label, key))
+        if index is None:
+            index = _Index(
+                (self._nodes[node_id][key], self._nodes[node_id]["name"], node_id)
+                for node_id in self._labels.get(label, ())
+                if self._nodes[node_id].get(key) is not None
+            )
+            self._indexes[label, key] = index
+        return index
+
+    def _find(self, model_cls: Type[Entity], filters: dict) -> List[str]:
+        """Node ids matching every lookup, each lookup is a range of its property index."""
+        label = model_cls.__label__
+        matches = None
+        for key, operator, value in self._parse_filters(model_cls, filters):
+            if value is None:
+                # a comparison with null matches nothing, as in Cypher
+                return []
+            if key == "node_id" and not operator:
+                found = [value] if value in self._labels.get(label, ()) else []
+            else:
+                found = self._get_index(label, key).find(operator, value)
+            matches = set(found) if matches is None else matches.intersection(found)
+        if matches is None:
+            return list(self._labels.get(label, ()))
+        return sorted(matches, key=lambda node_id: self._nodes[node_id]["name"])
+
+    def _order(
+            self,
+            model_cls: Type[Entity],
+            key: str,
+            direction: str,
+            node_ids: Optional[Iterable[str]],
+            sparse: bool,
+    ) -> List[str]:
+        """
+        Nodes having the property follow its index, the rest come last ordered by name when
+        the order is sparse, otherwise last ascending and first descending as nulls in Cypher.
+        """
+        members = self._labels.get(model_cls.__label__, set())
+        selected = members if node_ids is None else set(node_ids)
+        index = self._get_index(model_cls.__label__, key)
+        ordered = [node_id for node_id in index.node_ids if node_id in selected]
+        if direction == "DESC":
+            ordered.reverse()
+
+        if len(ordered) == len(selected):
+            return ordered
+        missing = sorted(
+            (node_id for node_id in selected if self._nodes[node_id].get(key) is None),
+            key=lambda node_id: self._nodes[node_id]["name"]
+        )
+        return missing + ordered if direction == "DESC" and not sparse else ordered + missing
+
+    def _order_by_degree(
+            self,
+            model_cls: Type[Entity],
+            key: str,
+            direction: str,
+            node_ids: Optional[Iterable[str]]
+    ) -> List[str]:
+        node_ids = self._labels.get(model_cls.__label__, set()) if node_ids is None else node_ids
+        sign = -1 if direction == "DESC" else 1
+        relation_types = get_record_class([model_cls.__label__]).COUNTS[key]
+        return sorted(
+            node_ids,
+            key=lambda node_id: (sign * self._get_degree(node_id, relation_types), self._nodes[node_id]["name"])
+        )
+
+    def _get_degree(self, node_id: str, relation_types: Tuple[str, ...]) -> int:
+        return sum(1 for relation_type, _ in self._edges[node_id] if relation_type in relation_types)
+
+    def _get_page(
+            self,
+            node_ids: List[str],
+            start: int,
+            limit: int = None,
+            connections: bool = False,
+            counts: Tuple[str, ...] = (),
+    ) -> Tuple[List[EntityRecord], bool]:
+        stop = start + limit if limit else None
+        is_next = bool(limit) and len(node_ids) > stop
+        return self._get_records(node_ids[start:stop], connections, counts), is_next
+
+    def _get_records(
+            self,
+            node_ids: List[str],
+            connections: bool = False,
+            counts: Tuple[str, ...] = ()
+    ) -> List[EntityRecord]:
+        records = [inflate_record(self._nodes[node_id]) for node_id in node_ids]
+        if connections:
+            self.attach_connections(records)
+        if counts:
+            for record in records:
+                record.counts = {}
+                for key in counts:
+                    if key not in record.COUNTS:
+                        raise ValueError(f"No such count {key} on {record.NAME}")
+                    record.counts[key] = self._get_degree(record.node_id, record.COUNTS[key])
+        return records
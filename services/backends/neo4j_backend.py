@@ -0,0 +1,539 @@
+from typing import Callable, List, Optional, Tuple, Type
+
+from neomodel import db
+
+from models.base import BaseModel
+from models.category import Category
+from models.company import Company
+from models.content import Content
+from models.dlc import DLC
+from models.entity import Entity
+from models.game import Game
+from models.genre import Genre
+from models.records import EntityRecord, get_record_class, inflate_record
+from services.backends.base import BaseBackend, ModelNotFoundException
+from services.database_services import DatabaseService
+from services.media_services import MediaService
+
+
+class Neo4jBackend(BaseBackend):
+    """Reads with Cypher queries routed by DatabaseService, writes through neomodel on the leader."""
+    BATCH_SIZE = 500
+    # indexed optional property: label of the nodes without it, the property index holds no nulls
+    SPARSE_LABELS = {"date": "Undated"}
+
+    def get_model(
+            self,
+            model_cls: Type[Entity],
+            connections: bool = False,
+            counts: Tuple[str, ...] = (),
+            **kwargs
+    ) -> EntityRecord:
+        conditions, params = self._get_conditions(model_cls, kwargs)
+        results, _ = DatabaseService.read_query(
+            f"MATCH (n:{model_cls.__label__}) {self._get_where(conditions)} RETURN n LIMIT 1",
+            params
+        )
+        if not results:
+            raise ModelNotFoundException
+        return self._inflate_records(results, connections, counts)[0]
+
+    def get_filtered_list(
+            self,
+            model_cls: Type[Entity],
+            start: int = 0,
+            limit: int = None,
+            order_by="-name",
+            connections: bool = False,
+            counts: Tuple[str, ...] = (),
+            **kwargs
+    ) -> Tuple[List[BaseModel], bool]:
+        """
+        Filters accept neomodel-like lookups: name="...", date__gte=date(2016, 1, 1).
+        Ordering by an indexed optional property (date) reads the nodes having it
+        from the index and puts the nodes without it last, ordered by name.
+        Ordering by a count of the record (game_count, relationship_count) uses relationship degrees.
+        """
+        conditions, params = self._get_conditions(model_cls, kwargs)
+        key, direction = self._get_order(model_cls, order_by)
+
+        if key in get_record_class([model_cls.__label__]).COUNTS:
+            order = f"{self._get_degree(model_cls, key)} {direction}, n.name"
+        elif self._is_sparse_order(model_cls, key, kwargs):
+            return self._get_sparse_list(
+                model_cls, conditions, params, key, direction, start, limit, connections, counts
+            )
+        else:
+            order = f"n.{key} {direction}"
+
+        cypher = f"MATCH (n:{model_cls.__label__}) {self._get_where(conditions)} " \
+                 f"RETURN n " \
+                 f"ORDER BY {order} "
+
+        return self.get_cyphered_list(model_cls, cypher, start, limit, connections, params, counts)
+
+    def get_related_list(
+            self,
+            model_cls: Type[Entity],
+            node_id: str,
+            related_cls: Type[Entity],
+            start: int = 0,
+            limit: int = None,
+            order_by="name",
+            connections: bool = False,
+            counts: Tuple[str, ...] = (),
+    ) -> Tuple[List[BaseModel], bool]:
+        key, direction = self._get_order(related_cls, order_by)
+        relation_types = self._get_relation_types(model_cls, related_cls)
+        cypher = f"MATCH (base:{model_cls.__label__} {{node_id: $node_id}})" \
+                 f"-[:{'|'.join(relation_types)}]-" \
+                 f"(n:{related_cls.__label__}) " \
+                 f"RETURN DISTINCT n " \
+                 f"ORDER BY n.{key} {direction} "
+
+        return self.get_cyphered_list(
+            related_cls, cypher, start, limit, connections, {"node_id": node_id}, counts
+        )
+
+    def get_timeline(self, model_cls: Type[Entity], period: str = "month", **kwargs) -> Tuple[List[dict], int]:
+        """
+        Counts of dated nodes per month or year, aggregated by one query over the date index,
+        and the number of undated nodes (None when filters exclude them anyway).
+        """
+        periods = {"month": 7, "year": 4}
+        if period not in periods:
+            raise ValueError(f"No such period {period}")
+
+        conditions, params = self._get_conditions(model_cls, kwargs)
+        cypher = f"MATCH (n:{model_cls.__label__}) " \
+                 f"{self._get_where(conditions + ['n.date IS NOT NULL'])} " \
+                 f"RETURN substring(n.date, 0, {periods[period]}) AS period, count(n) " \
+                 f"ORDER BY period"
+        results, _ = DatabaseService.read_query(cypher, params)
+        timeline = [{"period": period_, "count": count} for period_, count in results]
+
+        undated = None
+        if not kwargs:
+            # comes from the label count store, so no node is scanned
+            total, _ = DatabaseService.read_query(f"MATCH (n:{model_cls.__label__}) RETURN count(n)")
+            undated = total[0][0] - sum(row["count"] for row in timeline)
+        return timeline, undated
+
+    def get_cyphered_list(
+            self,
+            model_cls: Type[Entity],
+            cypher: str,
+            start: int = 0,
+            limit: int = None,
+            connections: bool = False,
+            params: dict = None,
+            counts: Tuple[str, ...] = (),
+    ) -> Tuple[List[BaseModel], bool]:
+        params = dict(params or {}, skip=start)
+        cypher += "SKIP $skip "
+        if limit:
+            # one extra row tells whether the next page exists without a second query
+            cypher += "LIMIT $limit"
+            params["limit"] = limit + 1
+
+        results, _ = DatabaseService.read_query(cypher, params)
+        is_next = bool(limit) and len(results) > limit
+        return self._inflate_records(results[:limit], connections, counts), is_next
+
+    def get_similar_list(
+            self,
+            model_cls: Type[Entity],
+            name: str,
+            start: int = 0,
+            limit: int = None,
+            connections: bool = False,
+            counts: Tuple[str, ...] = (),
+    ):
+        cypher = f"MATCH (base) WHERE id(base) = $base_id " \
+                 f"MATCH path = (base)--(connected)--(similar:{model_cls.__label__}) " \
+                 f"WHERE similar <> base " \
+                 f"RETURN similar, count(connected) " \
+                 f"ORDER BY count(connected) DESC, similar.name "
+
+        base_id = self.get_model(
+            model_cls,
+            name=name
+        ).id
+
+        return self.get_cyphered_list(
+            model_cls,
+            cypher,
+            start,
+            limit,
+            connections,
+            {"base_id": base_id},
+            counts
+        )
+
+    def _get_conditions(self, model_cls: Type[Entity], filters: dict) -> Tuple[List[str], dict]:
+        operators = {"gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+        conditions, params = [], {}
+        for key, operator, value in self._parse_filters(model_cls, filters):
+            param = f"{key}_{operator}" if operator else key
+            conditions.append(f"n.{key} {operators.get(operator, '=')} ${param}")
+            params[param] = value
+
+        return conditions, params
+
+    def _get_where(self, conditions: List[str]) -> str:
+        return f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    def _get_sparse_list(
+            self,
+            model_cls: Type[Entity],
+            conditions: List[str],
+            params: dict,
+            key: str,
+            direction: str,
+            start: int = 0,
+            limit: int = None,
+            connections: bool = False,
+            counts: Tuple[str, ...] = (),
+    ) -> Tuple[List[BaseModel], bool]:
+        label = model_cls.__label__
+        cypher = f"MATCH (n:{label}) {self._get_where(conditions + [f'n.{key} IS NOT NULL'])} " \
+                 f"RETURN n " \
+                 f"ORDER BY n.{key} {direction} "
+        records, is_next = self.get_cyphered_list(model_cls, cypher, start, limit, False, params)
+
+        if not is_next:
+            # the page reaches past the indexed nodes: the rest are the ones without the property
+            if records:
+                indexed_count = start + len(records)
+            else:
+                results, _ = DatabaseService.read_query(
+                    f"MATCH (n:{label}) {self._get_where(conditions + [f'n.{key} IS NOT NULL'])} "
+                    f"RETURN count(n)",
+                    params
+                )
+                indexed_count = results[0][0]
+
+            # the nodes of the marker label only, not a scan of the whole label
+            marker = f":{self.SPARSE_LABELS[key]}" if key in self.SPARSE_LABELS else ""
+            cypher = f"MATCH (n:{label}{marker}) {self._get_where(conditions + [f'n.{key} IS NULL'])} " \
+                     f"RETURN n " \
+                     f"ORDER BY n.name " \
+                     f"SKIP $skip "
+            params = dict(params, skip=max(0, start - indexed_count))
+            if limit:
+                cypher += "LIMIT $limit"
+                params["limit"] = limit - len(records) + 1
+
+            results, _ = DatabaseService.read_query(cypher, params)
+            if limit:
+                is_next = len(records) + len(results) > limit
+                results = results[:limit - len(records)]
+            records += self._inflate_records(results)
+
+        if connections:
+            self.attach_connections(records)
+        if counts:
+            self._attach_counts(records, counts)
+        return records, is_next
+
+    def _inflate_records(
+            self,
+            rows: list,
+            connections: bool = False,
+            counts: Tuple[str, ...] = ()
+    ) -> List[EntityRecord]:
+        records = [inflate_record(row[0]) for row in rows]
+        if connections:
+            self.attach_connections(records)
+        if counts:
+            self._attach_counts(records, counts)
+        return records
+
+    def _get_degree(self, model_cls: Type[Entity], key: str) -> str:
+        relation_types = get_record_class([model_cls.__label__]).COUNTS[key]
+        return f"size((n)-[:{'|'.join(relation_types)}]-())"
+
+    def _attach_counts(self, records: List[EntityRecord], counts: Tuple[str, ...]) -> None:
+        """Counts connections of the records by relationship degrees, the connected nodes are not expanded."""
+        for record in records:
+            record.counts = {}
+        for key in counts:
+            by_type = {}
+            for record in records:
+                if key not in record.COUNTS:
+                    raise ValueError(f"No such count {key} on {record.NAME}")
+                by_type.setdefault(record.COUNTS[key], []).append(record)
+
+            for relation_types, records_ in by_type.items():
+                cypher = f"MATCH (n) WHERE id(n) IN $ids " \
+                         f"RETURN id(n), size((n)-[:{'|'.join(relation_types)}]-())"
+                results, _ = DatabaseService.read_query(cypher, {"ids": [record.id for record in records_]})
+
+                by_id = {record.id: record for record in records_}
+                for node_id, count in results:
+                    by_id[node_id].counts[key] = count
+
+    def attach_connections(self, records: List[EntityRecord]) -> None:
+        """Resolves connections of every record with one query instead of one per relationship."""
+        relation_types = {
+            relation_type
+            for record in records
+            for _, relation_type, _ in record.CONNECTIONS
+        }
+        for record in records:
+            record.connections = {key: [] for key, _, _ in record.CONNECTIONS}
+        if not records or not relation_types:
+            return
+
+        cypher = f"MATCH (n)-[r:{'|'.join(sorted(relation_types))}]-(connected) " \
+                 f"WHERE id(n) IN $ids " \
+                 f"RETURN id(n), type(r), connected " \
+                 f"ORDER BY connected.name"
+        results, _ = DatabaseService.read_query(cypher, {"ids": [record.id for record in records]})
+
+        by_id = {record.id: record for record in records}
+        for node_id, relation_type, node in results:
+            record = by_id[node_id]
+            for key, connection_type, label in record.CONNECTIONS:
+                if connection_type == relation_type and label in node.labels:
+                    record.connections[key].append(inflate_record(node))
+
+    def create_model(self, model_cls: Type[Entity], **kwargs) -> Entity:
+        model_types = {
+            Entity: self._create_entity,
+            Company: self._create_entity,
+            Genre: self._create_entity,
+            Category: self._create_entity,
+            Content: self._create_content,
+            DLC: self._create_dlc,
+            Game: self._create_game,
+        }
+        method = model_types.get(model_cls)
+        if not method:
+            raise NotImplementedError
+        with DatabaseService.write_transaction():
+            return model_types[model_cls](model_cls, **kwargs)
+
+    def create_many(
+            self,
+            model_cls: Type[Entity],
+            payloads: List[dict],
+            batch_size: int = None,
+            on_batch: Callable[[List[dict], List[str]], None] = None
+    ) -> List[str]:
+        """
+        Each batch is one transaction of parameterised MERGE statements,
+        so nodes stay deduplicated by name. A failing batch leaves the previous ones committed.
+        """
+        batch_size = batch_size or self.BATCH_SIZE
+        rows = [self._get_row(model_cls, payload) for payload in payloads]
+        self._check_parents(model_cls, rows)
+        cypher = self._get_merge_cypher(model_cls)
+
+        node_ids = []
+        for offset in range(0, len(rows), batch_size):
+            with DatabaseService.write_transaction():
+                results, _ = db.cypher_query(cypher, {"rows": rows[offset:offset + batch_size]})
+            batch_ids = [row[0] for row in results]
+            node_ids.extend(batch_ids)
+            if on_batch:
+                on_batch(payloads[offset:offset + batch_size], batch_ids)
+        return node_ids
+
+    def delete_model(self, model_cls: Type[Entity], name: str) -> Optional[Tuple[str, List[Tuple[str, str, str]]]]:
+        with DatabaseService.write_transaction():
+            instance = model_cls.nodes.get_or_none(name=name)
+            if not instance:
+                return None
+            results, _ = db.cypher_query(
+                "MATCH (n)-[r]-(connected) WHERE id(n) = $id "
+                "RETURN type(r), labels(connected), connected.name",
+                {"id": instance.id}
+            )
+            node_id = instance.node_id
+            instance.delete()
+
+        return node_id, [
+            (relation_type, get_record_class(labels).LABEL, connected_name)
+            for relation_type, labels, connected_name in results
+        ]
+
+    def _create_entity(self, model_cls: Type[Entity], name: str) -> Entity:
+        instance = model_cls.nodes.get_or_none(name=name)
+        if not instance:
+            instance = model_cls(
+                name=name
+            )
+            instance.save()
+        return instance
+
+    def _create_content(
+            self,
+            model_cls: Type[Entity],
+            name: str, short_desc: str, long_desc: str, header_image: str,
+            is_free: bool = False, images: List[str] = None, movies: [List] = None,
+            publishers: List[str] = None, developers: List[str] = None, date=None,
+    ) -> Content:
+        images = MediaService.compact_many(images)
+        movies = MediaService.compact_many(movies)
+        if not publishers:
+            publishers = []
+        if not developers:
+            developers = []
+
+        instance = model_cls.nodes.get_or_none(name=name)
+
+        if date:
+            date = self._parse_date(date, model_cls.DATE_FORMAT)
+
+        if not instance:
+            instance = model_cls(
+                name=name,
+                is_free=is_free,
+                short_desc=short_desc,
+                long_desc=long_desc,
+                header_image=MediaService.compact(header_image),
+                images=images,
+                movies=movies,
+                date=date
+            )
+            instance.save()
+            self._set_sparse_labels(instance)
+
+        for publisher_name in publishers:
+            publisher = self._create_entity(Company, publisher_name)
+            instance.publishers.connect(publisher)
+
+        for developer_name in developers:
+            developer = self._create_entity(Company, developer_name)
+            instance.developers.connect(developer)
+
+        return instance
+
+    def _create_dlc(self, model_cls: Type[Entity], games: List[str] = None, **kwargs) -> DLC:
+        parents = [Game.nodes.get_or_none(name=name) for name in games or []]
+        if None in parents:
+            raise ModelNotFoundException
+        instance = self._create_content(
+            model_cls=model_cls,
+            **kwargs
+        )
+
+        for game in parents:
+            game.dlcs.connect(instance)
+
+        return instance
+
+    def _create_game(
+            self,
+            model_cls: Type[Entity],
+            genres: List[str] = None, categories: List[str] = None,
+            **kwargs
+    ) -> Game:
+        instance = self._create_content(
+            model_cls=model_cls,
+            **kwargs
+        )
+
+        if not genres:
+            genres = []
+        if not categories:
+            categories = []
+
+        for genre_name in genres:
+            genre = self._create_entity(Genre, genre_name)
+            instance.genres.connect(genre)
+
+        for category_name in categories:
+            category = self._create_entity(Category, category_name)
+            instance.categories.connect(category)
+
+        return instance
+
+    def _get_merge_cypher(self, model_cls: Type[Entity]) -> str:
+        cypher = f"UNWIND $rows AS row " \
+                 f"MERGE (n:{model_cls.__label__} {{name: row.name}}) " \
+                 f"ON CREATE SET {self._get_set_labels('n', model_cls)}" \
+                 f"n.node_id = row.node_id, n += row.properties "
+        cypher += self._get_set_sparse_labels(model_cls)
+
+        for key, (related_cls, relation_type) in self.RELATIONSHIPS.items():
+            if not hasattr(model_cls, key):
+                continue
+            cypher += f"FOREACH (related_name IN row.{key} | " \
+                      f"MERGE (related:{related_cls.__label__} {{name: related_name}}) " \
+                      f"ON CREATE SET {self._get_set_labels('related', related_cls)}" \
+                      f"related.node_id = replace(randomUUID(), '-', '') " \
+                      f"MERGE (n)-[:{relation_type}]->(related)) "
+
+        for key, (related_cls, relation_type) in self.PARENT_RELATIONSHIPS.items():
+            if not hasattr(model_cls, key):
+                continue
+            # the parents are checked before, so this MERGE only matches them
+            cypher += f"FOREACH (related_name IN row.{key} | " \
+                      f"MERGE (related:{related_cls.__label__} {{name: related_name}}) " \
+                      f"MERGE (related)-[:{relation_type}]->(n)) "
+
+        return cypher + "RETURN n.node_id"
+
+    def _check_parents(self, model_cls: Type[Entity], rows: List[dict]) -> None:
+        """Raises ModelNotFoundException unless every parent named by the rows exists."""
+        for key, (related_cls, _) in self.PARENT_RELATIONSHIPS.items():
+            names = {name for row in rows for name in row.get(key) or []}
+            if not hasattr(model_cls, key) or not names:
+                continue
+            results, _ = DatabaseService.read_query(
+                f"MATCH (n:{related_cls.__label__}) WHERE n.name IN $names RETURN n.name",
+                {"names": list(names)}
+            )
+            missing = names - {name for name, in results}
+            if missing:
+                raise ModelNotFoundException(f"No {related_cls.__name__} {', '.join(sorted(missing))}")
+
+    def _get_set_sparse_labels(self, model_cls: Type[Entity]) -> str:
+        properties = model_cls.defined_properties(aliases=False, rels=False)
+        return "".join(
+            f"FOREACH (_ IN CASE WHEN n.{key} IS NULL THEN [1] ELSE [] END | SET n:{marker}) "
+            for key, marker in self.SPARSE_LABELS.items() if key in properties
+        )
+
+    def _set_sparse_labels(self, instance: Entity) -> None:
+        markers = [
+            marker for key, marker in self.SPARSE_LABELS.items()
+            if key in instance.defined_properties(aliases=False, rels=False) and getattr(instance, key) is None
+        ]
+        if markers:
+            db.cypher_query(f"MATCH (n) WHERE id(n) = $id SET n:{':'.join(markers)}", {"id": instance.id})
+
+    def label_sparse_nodes(self, batch_size: int = None) -> int:
+        """
+        Backfills the SPARSE_LABELS of the nodes stored before them, batch by batch.
+        Returns the number of labelled nodes.
+        """
+        batch_size = batch_size or self.BATCH_SIZE
+        labelled = 0
+        for key, marker in self.SPARSE_LABELS.items():
+            while True:
+                with DatabaseService.write_transaction():
+                    results, _ = db.cypher_query(
+                        f"MATCH (n:{Content.__label__}) WHERE n.{key} IS NULL AND NOT n:{marker} "
+                        f"WITH n LIMIT $limit SET n:{marker} RETURN count(n)",
+                        {"limit": batch_size}
+                    )
+                labelled += results[0][0]
+                if results[0][0] < batch_size:
+                    break
+        return labelled
+
+    def _get_set_labels(self, variable: str, model_cls: Type[Entity]) -> str:
+        labels = [label for label in model_cls.inherited_labels() if label != model_cls.__label__]
+        if not labels:
+            return ""
+        return f"{variable}:{':'.join(labels)}, "
+
+
+if __name__ == "__main__":
+    from config import get_neo4j_url, get_neo4j_read_urls
+
+    DatabaseService.configure(get_neo4j_url(), get_neo4j_read_urls())
+    print("labelled", Neo4jBackend().label_sparse_nodes())
@@ -0,0 +1,281 @@
+import pickle
+import threading
+import time
+from abc import abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from services.event_services import ChangeEvent, EventService
+
+
+class ListCache:
+    """
+    Keeps whole small lists (genres, categories) in process memory.
+
+    An entry is dropped when a change event touches one of the labels it depends on,
+    and expires after ttl seconds anyway, so changes made by other workers are picked up too.
+    """
+    DEFAULT_TTL = 60
+
+    def __init__(self, ttl: int = DEFAULT_TTL):
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[float, frozenset, list]] = {}
+        self._lock = threading.Lock()
+        EventService.subscribe(self.invalidate_event)
+
+    def get_or_load(self, key: str, labels: Iterable[str], loader: Callable[[], list]) -> list:
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[2]
+
+        value = loader()
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, frozenset(labels), value)
+        return value
+
+    def invalidate(self, label: str = None) -> None:
+        with self._lock:
+            for key, (_, labels, _) in list(self._entries.items()):
+                if label is None or label in labels:
+                    del self._entries[key]
+
+    def invalidate_event(self, event: ChangeEvent) -> None:
+        labels = {event.model} | {label for _, label, _ in event.relationships}
+        for label in labels:
+            self.invalidate(label)
+
+
+class LRUCache:
+    """
+    Bounded mapping dropping the least recently used keys, counts its hits and misses.
+    on_remove(key, value) is called for every entry dropped or deleted.
+    """
+
+    def __init__(self, maxsize: int = 1024, on_remove: Optional[Callable[[Hashable, object], None]] = None):
+        self.maxsize = maxsize
+        self.on_remove = on_remove
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def set(self, key: Hashable, value) -> None:
+        removed = []
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                removed.append(self._entries.popitem(last=False))
+        self._removed(removed)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            removed = [(key, self._entries.pop(key))] if key in self._entries else []
+        self._removed(removed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> dict:
+        return get_stats(self.hits, self.misses, size=len(self._entries))
+
+    def _removed(self, entries: List[Tuple[Hashable, object]]) -> None:
+        if self.on_remove is not None:
+            for key, value in entries:
+                self.on_remove(key, value)
+
+
+class BaseSharedCache:
+    """Cache shared by the worker processes (L2), its values are pickled."""
+
+    @abstractmethod
+    def get_many(self, keys: List[str]) -> Dict[str, object]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def set_many(self, values: Dict[str, object]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_many(self, keys: Iterable[str]) -> None:
+        raise NotImplementedError
+
+
+class LocalSharedCache(BaseSharedCache):
+    """In-process stand-in of a shared cache, for tests and single process deployments."""
+
+    def __init__(self):
+        self._values: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: List[str]) -> Dict[str, object]:
+        with self._lock:
+            return {key: pickle.loads(self._values[key]) for key in keys if key in self._values}
+
+    def set_many(self, values: Dict[str, object]) -> None:
+        with self._lock:
+            self._values.update((key, pickle.dumps(value)) for key, value in values.items())
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._values.pop(key, None)
+
+
+class EntityCache:
+    """
+    Serialized entities keyed by node_id, a per-worker LRU (L1) in front of an optional shared cache (L2).
+
+    Entries keep the time their load started and live ttl seconds. A change event touching a node
+    marks the time of its invalidation, so an entry loaded before it, here or in the shared cache,
+    is never served again by this process. Writes of other processes are not seen as events,
+    they are picked up when the entries expire. The cache is off while its size is 0.
+    Invalidation times are kept for ttl seconds and names only for the entries of the LRU,
+    so the bookkeeping stays as bounded as the LRU.
+    """
+    DEFAULT_TTL = 60
+
+    def __init__(self, size: int = 0, ttl: int = DEFAULT_TTL, shared: BaseSharedCache = None):
+        self.local = LRUCache(size, self._forget)
+        self.ttl = ttl
+        self.shared = shared
+        self.shared_hits = 0
+        self.shared_misses = 0
+        # node_id: time of its last invalidation, oldest first
+        self._invalidated: Dict[str, float] = {}
+        # (label, name): node_id of the entries in the LRU, events name the connected nodes instead of giving ids
+        self._names: Dict[Tuple[str, str], str] = {}
+        self._lock = threading.Lock()
+        EventService.subscribe(self.invalidate_event)
+
+    @property
+    def enabled(self) -> bool:
+        return self.local.maxsize > 0
+
+    def configure(self, size: int = 0, ttl: int = DEFAULT_TTL, shared: BaseSharedCache = None) -> None:
+        with self._lock:
+            self._names.clear()
+        self.local = LRUCache(size, self._forget)
+        self.ttl = ttl
+        self.shared = shared
+
+    def get_many(self, node_ids: Iterable[str]) -> Dict[str, object]:
+        found, missing = {}, []
+        for node_id in node_ids:
+            entry = self.local.get(node_id)
+            if entry is not None and self._is_valid(node_id, entry):
+                found[node_id] = entry[2]
+            else:
+                missing.append(node_id)
+
+        if missing and self.shared is not None:
+            entries = self.shared.get_many(missing)
+            for node_id in missing:
+                entry = entries.get(node_id)
+                if entry is not None and self._is_valid(node_id, entry):
+                    self._set_local(node_id, entry)
+                    found[node_id] = entry[2]
+                    self.shared_hits += 1
+                else:
+                    self.shared_misses += 1
+        return found
+
+    def get_or_load_many(
+            self,
+            node_ids: List[str],
+            label: str,
+            loader: Callable[[List[str]], Dict[str, dict]]
+    ) -> Dict[str, object]:
+        """Values of node_ids, the missing ones are loaded together by loader(missing node_ids)."""
+        found = self.get_many(node_ids)
+        missing = [node_id for node_id in node_ids if node_id not in found]
+        if missing:
+            loaded_at = time.time()
+            loaded = loader(missing)
+            self.set_many(loaded, label, loaded_at)
+            found.update(loaded)
+        return found
+
+    def set_many(self, values: Dict[str, dict], label: str, loaded_at: float = None) -> None:
+        """Values carry a name, loaded_at is the time their load started, now by default."""
+        loaded_at = time.time() if loaded_at is None else loaded_at
+        entries = {
+            node_id: (loaded_at, label, value) for node_id, value in values.items()
+            if self._is_valid(node_id, (loaded_at, label, value))
+        }
+        for node_id, entry in entries.items():
+            self._set_local(node_id, entry)
+        if entries and self.shared is not None:
+            self.shared.set_many(entries)
+
+    def invalidate(self, node_ids: Iterable[str]) -> None:
+        node_ids = list(node_ids)
+        with self._lock:
+            now = time.time()
+            for node_id in node_ids:
+                # moved to the end, so the dict stays ordered by time
+                self._invalidated.pop(node_id, None)
+                self._invalidated[node_id] = now
+            # an entry loaded before an older invalidation has expired anyway
+            while self._invalidated:
+                oldest = next(iter(self._invalidated))
+                if self._invalidated[oldest] > now - self.ttl:
+                    break
+                del self._invalidated[oldest]
+        for node_id in node_ids:
+            self.local.delete(node_id)
+        if node_ids and self.shared is not None:
+            self.shared.delete_many(node_ids)
+
+    def invalidate_event(self, event: ChangeEvent) -> None:
+        node_ids = {event.node_id}
+        with self._lock:
+            for _, label, name in event.relationships:
+                if (label, name) in self._names:
+                    node_ids.add(self._names[label, name])
+        self.invalidate(node_ids)
+
+    def get_stats(self) -> dict:
+        return {
+            "l1": self.local.get_stats(),
+            "l2": get_stats(self.shared_hits, self.shared_misses) if self.shared is not None else None,
+        }
+
+    def _set_local(self, node_id: str, entry: Tuple[float, str, dict]) -> None:
+        _, label, value = entry
+        with self._lock:
+            self._names[label, value["name"]] = node_id
+        self.local.set(node_id, entry)
+
+    def _forget(self, node_id: str, entry: Tuple[float, str, dict]) -> None:
+        """on_remove of the LRU."""
+        _, label, value = entry
+        with self._lock:
+            if self._names.get((label, value["name"])) == node_id:
+                del self._names[label, value["name"]]
+
+    def _is_valid(self, node_id: str, entry: Tuple[float, str, object]) -> bool:
+        loaded_at = entry[0]
+        return loaded_at > self._invalidated.get(node_id, 0) and time.time() - loaded_at < self.ttl
+
+
+def get_stats(hits: int, misses: int, **kwargs) -> dict:
+    requests = hits + misses
+    return dict(kwargs, hits=hits, misses=misses, hit_rate=hits / requests if requests else None)
+
+
+list_cache = ListCache()
+entity_cache = EntityCache()
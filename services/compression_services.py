@@ -0,0 +1,141 @@
+import hashlib
+import zlib
+from typing import Iterable, Iterator, List, Optional
+
+from flask import Request, Response
+
+from services.cache_services import LRUCache
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class _Compressor:
+    """Incremental gzip or brotli compressor with the same process/finish interface."""
+
+    def __init__(self, encoding: str, level: int):
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=level)
+            self.process, self.finish = compressor.process, compressor.finish
+        else:
+            # wbits 31: gzip header and trailer around the deflate stream
+            compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+            self.process, self.finish = compressor.compress, compressor.flush
+
+
+class CompressionService:
+    """
+    Compresses responses negotiated through Accept-Encoding: brotli when the brotli package
+    is installed, gzip otherwise. Bodies under the threshold are sent as they are.
+    Compressed bodies are kept in an LRU keyed by the hash of the body, so a hot page
+    is compressed once; bodies over stream_threshold and streamed responses are compressed
+    chunk by chunk while they are sent.
+    """
+    ENCODINGS = ("br", "gzip")
+    MIMETYPES = ("application/json", "application/x-ndjson")
+    CHUNK_SIZE = 64 * 1024
+
+    threshold = 1024
+    stream_threshold = 256 * 1024
+    levels = {"gzip": 6, "br": 5}
+    cache = LRUCache(256)
+
+    @staticmethod
+    def configure(
+            threshold: int = 1024,
+            stream_threshold: int = 256 * 1024,
+            gzip_level: int = 6,
+            brotli_level: int = 5,
+            cache_size: int = 256
+    ) -> None:
+        CompressionService.threshold = threshold
+        CompressionService.stream_threshold = stream_threshold
+        CompressionService.levels = {"gzip": gzip_level, "br": brotli_level}
+        CompressionService.cache = LRUCache(cache_size)
+
+    @staticmethod
+    def negotiate(accept_encoding: str) -> Optional[str]:
+        """The supported encoding the client prefers, None for identity."""
+        weights = {}
+        for item in accept_encoding.split(","):
+            encoding, _, params = item.strip().partition(";")
+            weight = 1.0
+            for param in params.split(";"):
+                key, _, value = param.strip().partition("=")
+                if key == "q":
+                    try:
+                        weight = float(value)
+                    except ValueError:
+                        weight = 0.0
+            weights[encoding.strip().lower()] = weight
+
+        available = [
+            encoding for encoding in CompressionService.ENCODINGS
+            if encoding != "br" or brotli is not None
+        ]
+        candidates = [
+            (weights.get(encoding, weights.get("*", 0.0)), -position, encoding)
+            for position, encoding in enumerate(available)
+        ]
+        weight, _, encoding = max(candidates, default=(0.0, 0, None))
+        return encoding if weight > 0 else None
+
+    @staticmethod
+    def compress_response(request: Request, response: Response) -> Response:
+        """after_request hook."""
+        if response.mimetype not in CompressionService.MIMETYPES or "Content-Encoding" in response.headers:
+            return response
+        response.vary.add("Accept-Encoding")
+        if response.status_code < 200 or response.status_code in (204, 304):
+            return response
+
+        encoding = CompressionService.negotiate(request.headers.get("Accept-Encoding", ""))
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = CompressionService._stream(response.response, encoding)
+        else:
+            body = response.get_data()
+            if len(body) < CompressionService.threshold:
+                return response
+            key = (hashlib.sha1(body).digest(), encoding)
+            compressed = CompressionService.cache.get(key)
+            if compressed is not None:
+                response.set_data(compressed)
+            elif len(body) > CompressionService.stream_threshold:
+                chunks = (body[offset:offset + CompressionService.CHUNK_SIZE]
+                          for offset in range(0, len(body), CompressionService.CHUNK_SIZE))
+                response.response = CompressionService._stream(chunks, encoding, key)
+            else:
+                compressed = CompressionService.compress(body, encoding)
+                CompressionService.cache.set(key, compressed)
+                response.set_data(compressed)
+
+        if response.is_streamed:
+            response.headers.pop("Content-Length", None)
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    @staticmethod
+    def compress(body: bytes, encoding: str) -> bytes:
+        compressor = _Compressor(encoding, CompressionService.levels[encoding])
+        return compressor.process(body) + compressor.finish()
+
+    @staticmethod
+    def _stream(chunks: Iterable[bytes], encoding: str, key=None) -> Iterator[bytes]:
+        """Compressed chunks, the whole compressed body is cached under key once it is sent."""
+        compressor = _Compressor(encoding, CompressionService.levels[encoding])
+        sent: List[bytes] = []
+        for chunk in chunks:
+            compressed = compressor.process(chunk.encode() if isinstance(chunk, str) else chunk)
+            if compressed:
+                sent.append(compressed)
+                yield compressed
+        compressed = compressor.finish()
+        sent.append(compressed)
+        yield compressed
+        if key is not None:
+            CompressionService.cache.set(key, b"".join(sent))
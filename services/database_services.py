@@ -0,0 +1,129 @@
+import itertools
+import socket
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from neo4j import GraphDatabase, READ_ACCESS, WRITE_ACCESS
+from neomodel import config as config_db, db
+
+
+class DatabaseService:
+    """
+    Routes reads across the read replicas and writes to the leader.
+
+    Writes go through the neomodel connection, reads through one pooled driver
+    per replica. Bookmarks are kept per thread: a thread that has just written
+    passes the bookmark of its last transaction to the following reads,
+    so it always reads its own writes.
+    """
+    DEFAULT_PORT = 7687
+    CONNECT_TIMEOUT = 1.0
+
+    _drivers: Dict[str, object] = {}
+    _read_urls: List[str] = []
+    _read_urls_cycle = None
+    _lock = threading.Lock()
+    _local = threading.local()
+
+    @staticmethod
+    def configure(write_url: str, read_urls: List[str] = None) -> None:
+        config_db.DATABASE_URL = write_url
+        with DatabaseService._lock:
+            DatabaseService._read_urls = list(read_urls or [write_url])
+            DatabaseService._read_urls_cycle = itertools.cycle(DatabaseService._read_urls)
+
+    @staticmethod
+    def reset_connections() -> None:
+        """
+        Forgets the drivers without closing them, for a forked worker:
+        the sockets belong to the parent, the worker connects again on its first query.
+        """
+        with DatabaseService._lock:
+            DatabaseService._drivers = {}
+        db.driver = None
+        db.url = None
+
+    @staticmethod
+    def is_reachable(timeout: float = CONNECT_TIMEOUT) -> bool:
+        """
+        Whether a read replica accepts connections within timeout seconds,
+        without the retries of the driver, which wait up to 30 s for a database that is down.
+        """
+        for url in DatabaseService._read_urls or [config_db.DATABASE_URL]:
+            parsed = urlparse(url)
+            address = (parsed.hostname, parsed.port or DatabaseService.DEFAULT_PORT)
+            try:
+                socket.create_connection(address, timeout).close()
+                return True
+            except OSError:
+                continue
+        return False
+
+    @staticmethod
+    def get_bookmarks() -> List[str]:
+        return list(getattr(DatabaseService._local, "bookmarks", []))
+
+    @staticmethod
+    def set_bookmarks(bookmarks: Optional[List[str]]) -> None:
+        DatabaseService._local.bookmarks = [bookmark for bookmark in bookmarks or [] if bookmark]
+
+    @staticmethod
+    def read_query(cypher: str, params: dict = None) -> Tuple[list, list]:
+        """Runs cypher in a read transaction on the next replica; same result shape as db.cypher_query."""
+        def work(tx):
+            response = tx.run(cypher, params or {})
+            return [list(record.values()) for record in response], response.keys()
+
+        with DatabaseService._get_read_driver().session(
+                default_access_mode=READ_ACCESS,
+                bookmarks=DatabaseService.get_bookmarks()
+        ) as session:
+            results, meta = session.read_transaction(work)
+            DatabaseService._update_bookmark(session.last_bookmark())
+        return results, meta
+
+    @staticmethod
+    @contextmanager
+    def write_transaction():
+        """
+        Wraps neomodel writes in one explicit transaction on the leader, opened after
+        the bookmarks of the thread; the bookmark returned by the commit is kept for the following reads.
+        """
+        if db._active_transaction:
+            yield
+            return
+
+        db.begin(access_mode=WRITE_ACCESS, bookmarks=DatabaseService.get_bookmarks() or None)
+        try:
+            yield
+        except BaseException:
+            db.rollback()
+            raise
+        DatabaseService._update_bookmark(db.commit())
+
+    @staticmethod
+    def _update_bookmark(bookmark) -> None:
+        # a bookmark string of the 4.x driver, or a Bookmarks object of the newer ones
+        bookmarks = sorted(getattr(bookmark, "raw_values", None) or ([bookmark] if isinstance(bookmark, str) else []))
+        if bookmarks:
+            DatabaseService._local.bookmarks = bookmarks
+
+    @staticmethod
+    def _get_read_driver():
+        with DatabaseService._lock:
+            if DatabaseService._read_urls_cycle is None:
+                DatabaseService._read_urls = [config_db.DATABASE_URL]
+                DatabaseService._read_urls_cycle = itertools.cycle(DatabaseService._read_urls)
+            url = next(DatabaseService._read_urls_cycle)
+
+            driver = DatabaseService._drivers.get(url)
+            if not driver:
+                parsed = urlparse(url)
+                driver = GraphDatabase.driver(
+                    f"{parsed.scheme}://{parsed.hostname}:{parsed.port}",
+                    auth=(parsed.username, parsed.password)
+                )
+                DatabaseService._drivers[url] = driver
+        return driver
@@ -0,0 +1,232 @@
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from models.game import Game
+from models.records import EntityRecord
+from services.cache_services import entity_cache
+from services.event_services import ChangeEvent, EventService
+from services.model_services import ModelService
+
+
+class DocumentStore:
+    """
+    On-disk SQLite table of serialized game documents (with connections) keyed by node_id.
+    Uses WAL, so every worker process reads the file while a writer updates it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        with self._connection as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS documents "
+                "(node_id TEXT PRIMARY KEY, name TEXT NOT NULL, document TEXT NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS documents_name ON documents (name)")
+
+    def reset_connection(self) -> None:
+        """Forgets the connections without closing them, a forked worker opens its own."""
+        self._local = threading.local()
+
+    @property
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path)
+            self._local.connection = connection
+        return connection
+
+    def get_many(self, node_ids: List[str]) -> Dict[str, str]:
+        if not node_ids:
+            return {}
+        rows = self._connection.execute(
+            f"SELECT node_id, document FROM documents WHERE node_id IN ({', '.join('?' * len(node_ids))})",
+            node_ids
+        )
+        return dict(rows)
+
+    def put_many(self, documents: Iterable[dict]) -> None:
+        with self._connection as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO documents (node_id, name, document) VALUES (?, ?, ?)",
+                [(document["node_id"], document["name"], json.dumps(document)) for document in documents]
+            )
+
+    def delete_many(self, node_ids: Iterable[str] = (), names: Iterable[str] = ()) -> None:
+        with self._connection as connection:
+            connection.executemany("DELETE FROM documents WHERE node_id = ?", [(value,) for value in node_ids])
+            connection.executemany("DELETE FROM documents WHERE name = ?", [(value,) for value in names])
+
+
+class DocumentService:
+    """
+    Materialised game documents: list and detail reads become key lookups instead of
+    connection queries. Written games and games connected to a written entity are dropped,
+    then rebuilt on their next read, a page of them with one connections query.
+    """
+    store: Optional[DocumentStore] = None
+
+    @staticmethod
+    def configure(path: str) -> None:
+        if DocumentService.store is None:
+            EventService.subscribe(DocumentService.update)
+            # the store is opened before gunicorn forks its workers with --preload
+            os.register_at_fork(after_in_child=DocumentService.reset_connections)
+        DocumentService.store = DocumentStore(path)
+
+    @staticmethod
+    def reset_connections() -> None:
+        if DocumentService.store is not None:
+            DocumentService.store.reset_connection()
+
+    @staticmethod
+    def get_document(node_id: str, connections: bool = True) -> dict:
+        if DocumentService.store is None and not entity_cache.enabled:
+            instance = ModelService.get_model(Game, connections=connections, node_id=node_id)
+            return instance.serialize(connections=connections)
+
+        if DocumentService.store is None:
+            parts = entity_cache.get_many([node_id])
+            if node_id in parts:
+                document = DocumentService._assemble([parts[node_id]])[0]
+            else:
+                loaded_at = time.time()
+                instance = ModelService.get_model(Game, connections=True, node_id=node_id)
+                document = DocumentService._cache_parts([instance], loaded_at)[0]
+            if not connections:
+                document.pop("connections")
+            return document
+
+        documents = DocumentService.store.get_many([node_id])
+        if node_id in documents:
+            document = json.loads(documents[node_id])
+        else:
+            instance = ModelService.get_model(Game, connections=True, node_id=node_id)
+            document = instance.serialize(connections=True)
+            DocumentService.store.put_many([document])
+
+        if not connections:
+            document.pop("connections")
+        return document
+
+    @staticmethod
+    def get_documents(records: List[EntityRecord]) -> List[dict]:
+        """Documents of a page of game records, the missing ones are built with one connections query."""
+        if DocumentService.store is None and not entity_cache.enabled:
+            ModelService.attach_connections(records)
+            return [record.serialize(connections=True) for record in records]
+        if DocumentService.store is None:
+            return DocumentService._get_cached_documents(records)
+
+        documents = {
+            node_id: json.loads(document)
+            for node_id, document in DocumentService.store.get_many([record.node_id for record in records]).items()
+        }
+        missing = [record for record in records if record.node_id not in documents]
+        if missing:
+            ModelService.attach_connections(missing)
+            built = [DocumentService._build_document(record) for record in missing]
+            DocumentService.store.put_many(built)
+            documents.update((document["node_id"], document) for document in built)
+
+        result = []
+        for record in records:
+            document = dict(documents[record.node_id])
+            document.update(record.counts or {})
+            result.append(document)
+        return result
+
+    @staticmethod
+    def _get_cached_documents(records: List[EntityRecord]) -> List[dict]:
+        """
+        Game documents assembled from the entity cache: a game part lists node ids of its
+        connections, whose serializations are shared by every game connected to them.
+        """
+        by_id = {record.node_id: record for record in records}
+
+        def load(node_ids: List[str]) -> Dict[str, dict]:
+            loaded_at = time.time()
+            missing = [by_id[node_id] for node_id in node_ids]
+            ModelService.attach_connections(missing)
+            DocumentService._cache_connections(missing, loaded_at)
+            return {record.node_id: DocumentService._get_part(record) for record in missing}
+
+        parts = entity_cache.get_or_load_many(list(by_id), Game.__label__, load)
+        documents = DocumentService._assemble([parts[record.node_id] for record in records])
+        for document, record in zip(documents, records):
+            document.update(record.counts or {})
+        return documents
+
+    @staticmethod
+    def _assemble(parts: List[dict]) -> List[dict]:
+        node_ids = list({node_id for part in parts for ids in part["connections"].values() for node_id in ids})
+        entities = entity_cache.get_many(node_ids)
+        if len(entities) < len(node_ids):
+            # connections evicted before their game: the parts are built again
+            loaded_at = time.time()
+            records = [ModelService.get_model(Game, node_id=part["node_id"]) for part in parts]
+            return DocumentService._cache_parts(records, loaded_at)
+
+        documents = []
+        for part in parts:
+            document = dict(part)
+            document["connections"] = {
+                key: [entities[node_id] for node_id in ids] for key, ids in part["connections"].items()
+            }
+            documents.append(document)
+        return documents
+
+    @staticmethod
+    def _cache_parts(records: List[EntityRecord], loaded_at: float) -> List[dict]:
+        """Caches parts of records read since loaded_at, returns their documents."""
+        if any(record.connections is None for record in records):
+            ModelService.attach_connections(records)
+        DocumentService._cache_connections(records, loaded_at)
+        entity_cache.set_many(
+            {record.node_id: DocumentService._get_part(record) for record in records}, Game.__label__, loaded_at
+        )
+        return [DocumentService._build_document(record) for record in records]
+
+    @staticmethod
+    def _cache_connections(records: List[EntityRecord], loaded_at: float) -> None:
+        by_label = {}
+        for record in records:
+            for connected in itertools.chain.from_iterable(record.connections.values()):
+                by_label.setdefault(connected.LABEL, {})[connected.node_id] = connected.serialize()
+        for label, serializations in by_label.items():
+            entity_cache.set_many(serializations, label, loaded_at)
+
+    @staticmethod
+    def _get_part(record: EntityRecord) -> dict:
+        part = DocumentService._build_document(record)
+        part["connections"] = {
+            key: [connected.node_id for connected in connected_records]
+            for key, connected_records in record.connections.items()
+        }
+        return part
+
+    @staticmethod
+    def _build_document(record: EntityRecord) -> dict:
+        # counts are asked per request, so they are not stored
+        document = record.serialize(connections=True)
+        for key in record.counts or {}:
+            document.pop(key)
+        return document
+
+    @staticmethod
+    def update(event: ChangeEvent) -> None:
+        store = DocumentService.store
+        if store is None:
+            return
+
+        if event.model == Game.__label__:
+            # not rebuilt here: create_many would read every game of its batch again
+            store.delete_many(node_ids=[event.node_id])
+        else:
+            store.delete_many(names=[name for _, label, name in event.relationships if label == Game.__label__])
@@ -0,0 +1,143 @@
+import itertools
+import json
+import logging
+import threading
+from abc import abstractmethod
+from typing import Callable, List, NamedTuple, Tuple
+
+from neomodel import db
+
+from services.database_services import DatabaseService
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeEvent(NamedTuple):
+    version: int
+    action: str
+    model: str
+    node_id: str
+    name: str
+    # (relationship type, label of the connected node, name of the connected node)
+    relationships: Tuple[Tuple[str, str, str], ...] = ()
+
+    def serialize(self) -> dict:
+        return {
+            "version": self.version,
+            "action": self.action,
+            "model": self.model,
+            "node_id": self.node_id,
+            "name": self.name,
+            "relationships": [list(relationship) for relationship in self.relationships],
+        }
+
+
+class BasePublisher:
+    @abstractmethod
+    def publish(self, event: ChangeEvent) -> None:
+        raise NotImplementedError
+
+
+class CallbackPublisher(BasePublisher):
+    """In-process publisher, calls every subscribed callback with the event."""
+
+    def __init__(self):
+        self._callbacks: List[Callable[[ChangeEvent], None]] = []
+
+    def subscribe(self, callback: Callable[[ChangeEvent], None]) -> None:
+        self._callbacks.append(callback)
+
+    def unsubscribe(self, callback: Callable[[ChangeEvent], None]) -> None:
+        self._callbacks.remove(callback)
+
+    def publish(self, event: ChangeEvent) -> None:
+        for callback in list(self._callbacks):
+            callback(event)
+
+
+class ChangelogPublisher(BasePublisher):
+    """
+    Appends events to a changelog stored in Neo4j, so workers of other processes
+    can poll it. Changes are numbered by a counter node, which gives them
+    a version increasing across all the writers.
+    """
+    LABEL = "Change"
+
+    @staticmethod
+    def install() -> None:
+        db.cypher_query(
+            f"CREATE INDEX change_version IF NOT EXISTS FOR (change:{ChangelogPublisher.LABEL}) ON (change.version)"
+        )
+
+    def publish(self, event: ChangeEvent) -> None:
+        cypher = f"MERGE (counter:ChangeCounter {{name: 'changes'}}) " \
+                 f"SET counter.version = coalesce(counter.version, 0) + 1 " \
+                 f"CREATE (change:{self.LABEL} {{version: counter.version}}) " \
+                 f"SET change += $change"
+        change = event.serialize()
+        change.pop("version")
+        change["relationships"] = json.dumps(change["relationships"])
+
+        with DatabaseService.write_transaction():
+            db.cypher_query(cypher, {"change": change})
+
+    @staticmethod
+    def get_changes(since_version: int = 0, limit: int = 100) -> List[ChangeEvent]:
+        cypher = f"MATCH (change:{ChangelogPublisher.LABEL}) " \
+                 f"WHERE change.version > $version " \
+                 f"RETURN change ORDER BY change.version LIMIT $limit"
+        results, _ = DatabaseService.read_query(cypher, {"version": since_version, "limit": limit})
+        return [
+            ChangeEvent(
+                version=change["version"],
+                action=change["action"],
+                model=change["model"],
+                node_id=change["node_id"],
+                name=change["name"],
+                relationships=tuple(tuple(relationship) for relationship in json.loads(change["relationships"])),
+            ) for change, in results
+        ]
+
+
+class EventService:
+    """Fans change events of ModelService writes out to the registered publishers."""
+    CREATE = "create"
+    DELETE = "delete"
+
+    callbacks = CallbackPublisher()
+    _publishers: List[BasePublisher] = [callbacks]
+    _versions = itertools.count(1)
+    _lock = threading.Lock()
+
+    @staticmethod
+    def add_publisher(publisher: BasePublisher) -> None:
+        EventService._publishers.append(publisher)
+
+    @staticmethod
+    def remove_publisher(publisher: BasePublisher) -> None:
+        EventService._publishers.remove(publisher)
+
+    @staticmethod
+    def subscribe(callback: Callable[[ChangeEvent], None]) -> None:
+        EventService.callbacks.subscribe(callback)
+
+    @staticmethod
+    def unsubscribe(callback: Callable[[ChangeEvent], None]) -> None:
+        EventService.callbacks.unsubscribe(callback)
+
+    @staticmethod
+    def publish(
+            action: str, model: str, node_id: str, name: str,
+            relationships: Tuple[Tuple[str, str, str], ...] = ()
+    ) -> ChangeEvent:
+        with EventService._lock:
+            version = next(EventService._versions)
+
+        event = ChangeEvent(version, action, model, node_id, name, tuple(relationships))
+        for publisher in list(EventService._publishers):
+            try:
+                publisher.publish(event)
+            except Exception:
+                # the write is already committed, a failing subscriber must not fail it
+                logger.exception("Publishing %s with %s failed", event, publisher)
+        return event
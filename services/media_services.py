@@ -0,0 +1,170 @@
+import json
+import logging
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from neomodel import db
+
+from config import get_media_prefixes
+from models.records import get_record_class
+from services.database_services import DatabaseService
+from services.event_services import EventService
+
+logger = logging.getLogger(__name__)
+
+# media of a response: stored ids or urls
+MEDIA_CHOICES = ("id", "url")
+
+
+class MediaService:
+    """
+    Media urls are stored as compact ids, "prefix:path", where the prefix names a url template
+    of MEDIA_PREFIXES ("https://cdn.example.com/apps/{path}"). Ids are interned, so the same
+    id is one string in memory. Urls matching no template are kept as they are.
+    """
+    FIELDS = ("header_image", "images", "movies")
+    SEPARATOR = ":"
+    PLACEHOLDER = "{path}"
+    BATCH_SIZE = 500
+
+    _templates: Dict[str, Tuple[str, str]] = {}
+
+    @staticmethod
+    def configure(prefixes: Dict[str, str]) -> None:
+        """prefixes: prefix -> url template with one {path}, the longest templates are tried first."""
+        templates = {}
+        for prefix, template in prefixes.items():
+            head, placeholder, tail = template.partition(MediaService.PLACEHOLDER)
+            if not placeholder or MediaService.SEPARATOR in prefix:
+                raise ValueError(f"Bad media prefix {prefix}: {template}")
+            templates[prefix] = (head, tail)
+        MediaService._templates = dict(sorted(templates.items(), key=lambda item: -len(item[1][0])))
+
+    @staticmethod
+    def compact(url: Optional[str]) -> Optional[str]:
+        if not url:
+            return url
+        for prefix, (head, tail) in MediaService._templates.items():
+            if url.startswith(head) and url.endswith(tail) and len(url) >= len(head) + len(tail):
+                return sys.intern(f"{prefix}{MediaService.SEPARATOR}{url[len(head):len(url) - len(tail)]}")
+        return url
+
+    @staticmethod
+    def expand(media_id: Optional[str]) -> Optional[str]:
+        if not media_id:
+            return media_id
+        prefix, separator, path = media_id.partition(MediaService.SEPARATOR)
+        if not separator or prefix not in MediaService._templates:
+            return media_id
+        head, tail = MediaService._templates[prefix]
+        return f"{head}{path}{tail}"
+
+    @staticmethod
+    def compact_many(urls: Optional[Iterable[str]]) -> List[str]:
+        return [MediaService.compact(url) for url in urls or []]
+
+    @staticmethod
+    def expand_document(document: dict) -> dict:
+        """Copy of a serialized content with the media of it and of its connections as urls."""
+        document = dict(document)
+        for field in MediaService.FIELDS:
+            if isinstance(document.get(field), list):
+                document[field] = [MediaService.expand(media_id) for media_id in document[field]]
+            elif field in document:
+                document[field] = MediaService.expand(document[field])
+        if document.get("connections"):
+            document["connections"] = {
+                key: [MediaService.expand_document(connected) for connected in connected_list]
+                for key, connected_list in document["connections"].items()
+            }
+        return document
+
+    @staticmethod
+    def serialize(documents: List[dict], media: str = "id") -> List[dict]:
+        """Documents of a response: media as stored ids, or as urls when media is "url"."""
+        if media != "url":
+            return documents
+        return [MediaService.expand_document(document) for document in documents]
+
+    @staticmethod
+    def migrate(batch_size: int = None) -> Dict[str, int]:
+        """
+        Rewrites media of the stored Content nodes as ids, batch by batch. A change event is
+        published per rewritten node (the one of a DLC names its games), so the documents and
+        cached entities holding the old urls are dropped; snapshots have to be built again.
+        Returns the bytes of the media properties before and after, and the changed nodes.
+        """
+        batch_size = batch_size or MediaService.BATCH_SIZE
+        stats = {"nodes": 0, "bytes_before": 0, "bytes_after": 0}
+        last_id = -1
+        while True:
+            results, _ = DatabaseService.read_query(
+                f"MATCH (n:Content) WHERE id(n) > $last_id "
+                f"RETURN id(n), labels(n), n.node_id, n.name, [(n)-[:DLC_OF]-(game:Game) | game.name], "
+                f"{', '.join(f'n.{field}' for field in MediaService.FIELDS)} "
+                f"ORDER BY id(n) LIMIT $limit",
+                {"last_id": last_id, "limit": batch_size}
+            )
+            if not results:
+                return stats
+
+            rows, events = [], []
+            for node_id, labels, uuid, name, games, header_image, images, movies in results:
+                before = {"header_image": header_image, "images": images or [], "movies": movies or []}
+                after = {
+                    "header_image": MediaService.compact(header_image),
+                    "images": MediaService.compact_many(images),
+                    "movies": MediaService.compact_many(movies),
+                }
+                stats["bytes_before"] += MediaService._get_size(before)
+                stats["bytes_after"] += MediaService._get_size(after)
+                if after != before:
+                    rows.append(dict(after, id=node_id))
+                    relationships = [("DLC_OF", "Game", game) for game in games]
+                    events.append((get_record_class(labels).LABEL, uuid, name, relationships))
+
+            if rows:
+                with DatabaseService.write_transaction():
+                    db.cypher_query(
+                        "UNWIND $rows AS row MATCH (n) WHERE id(n) = row.id "
+                        "SET n.header_image = row.header_image, n.images = row.images, n.movies = row.movies",
+                        {"rows": rows}
+                    )
+            for event in events:
+                EventService.publish(EventService.CREATE, *event)
+            stats["nodes"] += len(rows)
+            last_id = results[-1][0]
+
+    @staticmethod
+    def measure(documents: List[dict]) -> Dict[str, int]:
+        """JSON bytes of documents with media as ids and as urls."""
+        return {
+            "id_bytes": len(json.dumps(documents)),
+            "url_bytes": len(json.dumps(MediaService.serialize(documents, "url"))),
+        }
+
+    @staticmethod
+    def _get_size(media: dict) -> int:
+        return sum(
+            len(value.encode()) for value in [media["header_image"], *media["images"], *media["movies"]] if value
+        )
+
+
+MediaService.configure(get_media_prefixes())
+
+
+if __name__ == "__main__":
+    from config import get_document_store_path, get_neo4j_url, get_neo4j_read_urls
+    from models.game import Game
+    from services.model_services import ModelService
+
+    DatabaseService.configure(get_neo4j_url(), get_neo4j_read_urls())
+    if get_document_store_path():
+        from services.document_services import DocumentService
+
+        DocumentService.configure(get_document_store_path())
+    print("store", MediaService.migrate())
+    # events of this process do not reach the running workers
+    logger.warning("Media migrated: flush the shared entity cache and build the snapshots again")
+    records, _ = ModelService.get_filtered_list(Game, limit=100, connections=True)
+    print("response", MediaService.measure([record.serialize(connections=True) for record in records]))
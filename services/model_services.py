@@ -1,29 +1,33 @@
-from datetime import datetime
 from typing import List, Tuple, Type
 
-from neomodel import db
-
 from models.base import BaseModel
-from models.category import Category
-from models.company import Company
-from models.content import Content
-from models.dlc import DLC
 from models.entity import Entity
-from models.game import Game
-from models.genre import Genre
+from models.records import EntityRecord
+from services.backends.base import BaseBackend, ModelNotFoundException
+from services.backends.neo4j_backend import Neo4jBackend
+from services.event_services import EventService
 
 
-class ModelNotFoundException(Exception):
-    pass
+class ModelService:
+    """
+    Entry point of the resources to the storage. Calls are delegated to the configured
+    backend (Neo4j unless use_backend was called), writes publish change events here,
+    so every backend notifies the caches the same way.
+    """
+    backend: BaseBackend = Neo4jBackend()
 
+    @staticmethod
+    def use_backend(backend: BaseBackend) -> None:
+        ModelService.backend = backend
 
-class ModelService:
     @staticmethod
-    def get_model(model_cls: Type[Entity], **kwargs) -> Entity:
-        instance = model_cls.nodes.get_or_none(**kwargs)
-        if not instance:
-            raise ModelNotFoundException
-        return instance
+    def get_model(
+            model_cls: Type[Entity],
+            connections: bool = False,
+            counts: Tuple[str, ...] = (),
+            **kwargs
+    ) -> EntityRecord:
+        return ModelService.backend.get_model(model_cls, connections, counts, **kwargs)
 
     @staticmethod
     def get_filtered_list(
@@ -31,16 +35,41 @@ class ModelService:
             start: int = 0,
             limit: int = None,
             order_by="-name",
+            connections: bool = False,
+            counts: Tuple[str, ...] = (),
             **kwargs
     ) -> Tuple[List[BaseModel], bool]:
-        results = model_cls.nodes.filter(**kwargs).order_by(order_by)
+        """
+        Filters accept neomodel-like lookups: name="...", date__gte=date(2016, 1, 1).
+        Ordering by an optional property (date) puts the nodes without it last, ordered by name.
+        Ordering by a count of the record (game_count, relationship_count) uses relationship degrees.
+        """
+        return ModelService.backend.get_filtered_list(
+            model_cls, start, limit, order_by, connections, counts, **kwargs
+        )
 
-        if limit:
-            offset = start + limit
-        else:
-            offset = len(results)
+    @staticmethod
+    def get_related_list(
+            model_cls: Type[Entity],
+            node_id: str,
+            related_cls: Type[Entity],
+            start: int = 0,
+            limit: int = None,
+            order_by="name",
+            connections: bool = False,
+            counts: Tuple[str, ...] = (),
+    ) -> Tuple[List[BaseModel], bool]:
+        return ModelService.backend.get_related_list(
+            model_cls, node_id, related_cls, start, limit, order_by, connections, counts
+        )
 
-        return results[start:offset], offset < len(results)
+    @staticmethod
+    def get_timeline(model_cls: Type[Entity], period: str = "month", **kwargs) -> Tuple[List[dict], int]:
+        """
+        Counts of dated nodes per month or year
+        and the number of undated nodes (None when filters exclude them anyway).
+        """
+        return ModelService.backend.get_timeline(model_cls, period, **kwargs)
 
     @staticmethod
     def get_cyphered_list(
@@ -48,14 +77,12 @@ class ModelService:
             cypher: str,
             start: int = 0,
             limit: int = None,
+            connections: bool = False,
+            params: dict = None,
+            counts: Tuple[str, ...] = (),
     ) -> Tuple[List[BaseModel], bool]:
-        cypher += f"SKIP {start} LIMIT {limit}"
-        results, _ = db.cypher_query(cypher)
-        results = [model_cls.inflate(row[0]) for row in results]
-        start += limit
-
-        next_results, _ = db.cypher_query(cypher)
-        return results, len(next_results) > 0
+        """Only available with the Neo4j backend."""
+        return ModelService.backend.get_cyphered_list(model_cls, cypher, start, limit, connections, params, counts)
 
     @staticmethod
     def get_similar_list(
@@ -63,127 +90,45 @@ class ModelService:
             name: str,
             start: int = 0,
             limit: int = None,
-    ):
-
-        cypher_placeholder = "%node_id"
-        cypher = f"START base = node(%node_id) " \
-                 f"MATCH path = (base)--(connected)--(similar:{model_cls.NAME}) " \
-                 f"RETURN similar, count(connected) " \
-                 f"ORDER BY count(connected) DESC "
-
-        node_id = ModelService.get_model(
-            model_cls,
-            name=name
-        ).id
-
-        return ModelService.get_cyphered_list(
-            model_cls,
-            cypher.replace(cypher_placeholder, str(node_id)),
-            start,
-            limit
-        )
-
-    @staticmethod
-    def create_model(model_cls: Type[Entity], **kwargs) -> Entity:
-        model_types = {
-            Entity: ModelService._create_entity,
-            Company: ModelService._create_entity,
-            Genre: ModelService._create_entity,
-            Category: ModelService._create_entity,
-            Content: ModelService._create_content,
-            DLC: ModelService._create_content,
-            Game: ModelService._create_game,
-        }
-        method = model_types.get(model_cls)
-        if not method:
-            raise NotImplementedError
-        return model_types[model_cls](model_cls, **kwargs)
+            connections: bool = False,
+            counts: Tuple[str, ...] = (),
+    ) -> Tuple[List[BaseModel], bool]:
+        """Nodes sharing the most connected nodes with the named one, ties ordered by name."""
+        return ModelService.backend.get_similar_list(model_cls, name, start, limit, connections, counts)
 
     @staticmethod
-    def delete_model(model_cls: Type[Entity], name: str) -> None:
-        instance = model_cls.nodes.get_or_none(name=name)
-        if instance:
-            instance.delete()
+    def attach_connections(records: List[EntityRecord]) -> None:
+        ModelService.backend.attach_connections(records)
 
     @staticmethod
-    def _create_entity(model_cls: Type[Entity], name: str) -> Entity:
-        instance = model_cls.nodes.get_or_none(name=name)
-        if not instance:
-            instance = model_cls(
-                name=name
-            )
-            instance.save()
+    def create_model(model_cls: Type[Entity], **kwargs) -> BaseModel:
+        instance = ModelService.backend.create_model(model_cls, **kwargs)
+        EventService.publish(
+            EventService.CREATE, model_cls.__label__, instance.node_id, instance.name,
+            ModelService.backend.get_relationships(model_cls, kwargs)
+        )
         return instance
 
     @staticmethod
-    def _create_content(
-            model_cls: Type[Entity],
-            name: str, short_desc: str, long_desc: str, header_image: str,
-            is_free: bool = False, images: List[str] = None, movies: [List] = None,
-            publishers: List[str] = None, developers: List[str] = None, date=None,
-    ) -> Content:
-        if not images:
-            images = []
-        if not movies:
-            movies = []
-        if not publishers:
-            publishers = []
-        if not developers:
-            developers = []
-
-        instance = model_cls.nodes.get_or_none(name=name)
-
-        if date:
-            try:
-                date = datetime.strptime(date, model_cls.DATE_FORMAT)
-            except ValueError:
-                date = None
-
-        if not instance:
-            instance = model_cls(
-                name=name,
-                is_free=is_free,
-                short_desc=short_desc,
-                long_desc=long_desc,
-                header_image=header_image,
-                images=images,
-                movies=movies,
-                date=date
-            )
-            instance.save()
-
-        for publisher_name in publishers:
-            publisher = ModelService._create_entity(Company, publisher_name)
-            instance.publishers.connect(publisher)
-
-        for developer_name in developers:
-            developer = ModelService._create_entity(Company, developer_name)
-            instance.developers.connect(developer)
-
-        return instance
+    def create_many(model_cls: Type[Entity], payloads: List[dict], batch_size: int = None) -> List[str]:
+        """
+        Writes payloads of create_model in batches, nodes stay deduplicated by name.
+        Returns node ids in the order of payloads. Events of a batch are published once it is committed,
+        so the batches written before a failing one are not left stale in the caches.
+        """
+        def publish(batch: List[dict], node_ids: List[str]) -> None:
+            for payload, node_id in zip(batch, node_ids):
+                EventService.publish(
+                    EventService.CREATE, model_cls.__label__, node_id, payload["name"],
+                    ModelService.backend.get_relationships(model_cls, payload)
+                )
+
+        return ModelService.backend.create_many(model_cls, payloads, batch_size, publish)
 
     @staticmethod
-    def _create_game(
-            model_cls: Type[Entity],
-            genres: List[str] = None, categories: List[str] = None,
-            **kwargs
-    ) -> Game:
-        instance = ModelService._create_content(
-            model_cls=model_cls,
-            **kwargs
-        )
-
-        if not genres:
-            genres = []
-        if not categories:
-            categories = []
-
-        for genre_name in genres:
-            genre = ModelService._create_entity(Genre, genre_name)
-            instance.genres.connect(genre)
-
-        for category_name in categories:
-            category = ModelService._create_entity(Category, category_name)
-            instance.categories.connect(category)
-
-        return instance
+    def delete_model(model_cls: Type[Entity], name: str) -> None:
+        deleted = ModelService.backend.delete_model(model_cls, name)
+        if deleted is None:
+            return
+        node_id, relationships = deleted
+        EventService.publish(EventService.DELETE, model_cls.__label__, node_id, name, relationships)
@@ -1,3 +1,6 @@
+from urllib.parse import urlencode
+
+
 class PaginationService:
     MAX_LIMIT = 100
 
@@ -7,20 +10,24 @@ class PaginationService:
             url: str,
             is_next: bool = True,
             start: int = 0,
-            limit: int = MAX_LIMIT
+            limit: int = MAX_LIMIT,
+            params: dict = None
     ) -> dict:
         if limit > PaginationService.MAX_LIMIT:
             limit = PaginationService.MAX_LIMIT
 
+        # keeps the other query parameters (sort, filters) in the links
+        query = "".join(f"&{urlencode({key: value})}" for key, value in (params or {}).items())
+
         paginated = {"start": start, "limit": limit}
         if start == 0:
             paginated["previous"] = None
         else:
-            paginated["previous"] = url + f"?start={max(0, start - limit)}&limit={start}"
+            paginated["previous"] = url + f"?start={max(0, start - limit)}&limit={start}" + query
         if not is_next:
             paginated["next"] = None
         else:
-            paginated["next"] = url + f"?start={start + limit}&limit={limit}"
+            paginated["next"] = url + f"?start={start + limit}&limit={limit}" + query
 
         paginated["results"] = list_
         return paginated
@@ -0,0 +1,412 @@
+import json
+import mmap
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from itertools import islice
+from typing import Iterable, List, Tuple, Type
+
+from models.base import BaseModel
+from models.entity import Entity
+from models.game import Game
+from models.records import EntityRecord, GameRecord, RECORDS_BY_LABEL
+from services.backends.base import BaseBackend, ModelNotFoundException
+from services.model_services import ModelService
+
+
+class SnapshotService:
+    """
+    Read-only catalogue snapshot: one binary file memory-mapped by every worker.
+
+    Games are numbered in node_id order and entities likewise, so ids are looked up
+    by binary search. Serialized documents sit in blobs addressed by offset arrays,
+    and game/entity adjacency is stored as CSR arrays (indptr + indices) in both
+    directions, with one entry per relationship.
+    """
+    MAGIC = b"GSNAP\x00\x00\x01"
+    ID_SIZE = 32
+    HEADER = struct.Struct("<8sIII")
+    SECTION = struct.Struct("<QQ")
+    SECTIONS = (
+        "game_ids", "game_offsets", "game_documents", "name_offsets", "names",
+        "name_order", "date_order", "dates", "game_indptr", "game_indices",
+        "entity_ids", "entity_offsets", "entity_documents", "entity_indptr", "entity_indices",
+    )
+    ALIGNMENT = 8
+    EXPORT_BATCH_SIZE = 1000
+
+    @staticmethod
+    def export(path: str, batch_size: int = None) -> None:
+        batch_size = batch_size or SnapshotService.EXPORT_BATCH_SIZE
+        documents, start, is_next = [], 0, True
+        while is_next:
+            records, is_next = ModelService.get_filtered_list(
+                Game, start=start, limit=batch_size, order_by="name", connections=True
+            )
+            documents.extend(record.serialize(connections=True) for record in records)
+            start += batch_size
+        SnapshotService.write(path, documents)
+
+    @staticmethod
+    def write(path: str, documents: Iterable[dict]) -> None:
+        """Writes serialized game documents (with connections) into a snapshot file."""
+        games = sorted(documents, key=lambda document: document["node_id"])
+
+        entities = {}
+        for game in games:
+            for key, _, label in GameRecord.CONNECTIONS:
+                for connected in game["connections"].get(key, []):
+                    entities.setdefault(connected["node_id"], dict(connected, label=label))
+        entity_ids = sorted(entities)
+        entity_index = {node_id: index for index, node_id in enumerate(entity_ids)}
+
+        game_edges = [
+            [
+                entity_index[connected["node_id"]]
+                for key, _, _ in GameRecord.CONNECTIONS
+                for connected in game["connections"].get(key, [])
+            ] for game in games
+        ]
+        entity_edges = [[] for _ in entity_ids]
+        for game_index, edges in enumerate(game_edges):
+            for index in edges:
+                entity_edges[index].append(game_index)
+
+        dates = array("I", [SnapshotService._pack_date(game.get("date")) for game in games])
+        dated_count = sum(1 for date in dates if date)
+        name_order = sorted(range(len(games)), key=lambda index: games[index]["name"])
+        date_order = sorted((index for index in name_order if dates[index]), key=lambda index: dates[index])
+        date_order += [index for index in name_order if not dates[index]]
+
+        sections = {
+            "game_ids": SnapshotService._pack_ids(game["node_id"] for game in games),
+            "name_order": array("I", name_order).tobytes(),
+            "date_order": array("I", date_order).tobytes(),
+            "dates": dates.tobytes(),
+            "entity_ids": SnapshotService._pack_ids(entity_ids),
+        }
+        sections["game_offsets"], sections["game_documents"] = SnapshotService._pack_blob(
+            json.dumps(game).encode() for game in games
+        )
+        sections["name_offsets"], sections["names"] = SnapshotService._pack_blob(
+            game["name"].encode() for game in games
+        )
+        sections["entity_offsets"], sections["entity_documents"] = SnapshotService._pack_blob(
+            json.dumps(entities[node_id]).encode() for node_id in entity_ids
+        )
+        sections["game_indptr"], sections["game_indices"] = SnapshotService._pack_csr(game_edges)
+        sections["entity_indptr"], sections["entity_indices"] = SnapshotService._pack_csr(entity_edges)
+
+        header_size = SnapshotService.HEADER.size + SnapshotService.SECTION.size * len(SnapshotService.SECTIONS)
+        offset, table, body = SnapshotService._align(header_size), [], []
+        for name in SnapshotService.SECTIONS:
+            data = sections[name]
+            table.append(SnapshotService.SECTION.pack(offset, len(data)))
+            padding = SnapshotService._align(len(data)) - len(data)
+            body.append(data + b"\x00" * padding)
+            offset += len(data) + padding
+
+        with open(path, "wb") as file:
+            file.write(SnapshotService.HEADER.pack(
+                SnapshotService.MAGIC, len(games), len(entity_ids), dated_count
+            ))
+            file.write(b"".join(table))
+            file.write(b"\x00" * (SnapshotService._align(header_size) - header_size))
+            file.write(b"".join(body))
+
+    @staticmethod
+    def _pack_date(date: str) -> int:
+        if not date:
+            return 0
+        value = datetime.strptime(date, BaseModel.DATE_FORMAT)
+        return value.year * 10000 + value.month * 100 + value.day
+
+    @staticmethod
+    def _pack_ids(node_ids: Iterable[str]) -> bytes:
+        packed = []
+        for node_id in node_ids:
+            encoded = node_id.encode()
+            if len(encoded) > SnapshotService.ID_SIZE:
+                raise ValueError(f"Node id {node_id} is longer than {SnapshotService.ID_SIZE} bytes")
+            packed.append(encoded.ljust(SnapshotService.ID_SIZE, b"\x00"))
+        return b"".join(packed)
+
+    @staticmethod
+    def _pack_blob(values: Iterable[bytes]) -> Tuple[bytes, bytes]:
+        offsets, blob = array("Q", [0]), []
+        for value in values:
+            blob.append(value)
+            offsets.append(offsets[-1] + len(value))
+        return offsets.tobytes(), b"".join(blob)
+
+    @staticmethod
+    def _pack_csr(edges: List[List[int]]) -> Tuple[bytes, bytes]:
+        indptr, indices = array("I", [0]), array("I")
+        for row in edges:
+            indices.extend(row)
+            indptr.append(len(indices))
+        return indptr.tobytes(), indices.tobytes()
+
+    @staticmethod
+    def _align(size: int) -> int:
+        return -(-size // SnapshotService.ALIGNMENT) * SnapshotService.ALIGNMENT
+
+
+class SnapshotBackend(BaseBackend):
+    """
+    Serves the ModelService read methods of the game endpoints straight from a snapshot.
+    The file is memory-mapped read-only, so forked workers share its pages; writes are not supported.
+    """
+    FORMATS = {
+        "game_offsets": "Q", "entity_offsets": "Q", "name_offsets": "Q",
+        "name_order": "I", "date_order": "I", "dates": "I",
+        "game_indptr": "I", "game_indices": "I", "entity_indptr": "I", "entity_indices": "I",
+    }
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+
+        magic, self.games_count, self.entities_count, self.dated_count = SnapshotService.HEADER.unpack_from(view)
+        if magic != SnapshotService.MAGIC:
+            raise ValueError(f"{path} is not a catalogue snapshot")
+
+        self._sections = {}
+        for number, name in enumerate(SnapshotService.SECTIONS):
+            offset, length = SnapshotService.SECTION.unpack_from(
+                view, SnapshotService.HEADER.size + number * SnapshotService.SECTION.size
+            )
+            section = view[offset:offset + length]
+            self._sections[name] = section.cast(self.FORMATS[name]) if name in self.FORMATS else section
+
+    def get_model(
+            self,
+            model_cls: Type[Entity],
+            connections: bool = False,
+            counts: Tuple[str, ...] = (),
+            **kwargs
+    ) -> EntityRecord:
+        if model_cls.__label__ != GameRecord.LABEL:
+            index = self._find_id("entity_ids", self.entities_count, kwargs.get("node_id"))
+            if index is None or set(kwargs) != {"node_id"}:
+                raise ModelNotFoundException
+            return self._entity_record(index, counts)
+
+        if set(kwargs) == {"node_id"}:
+            index = self._find_id("game_ids", self.games_count, kwargs["node_id"])
+        elif set(kwargs) == {"name"}:
+            index = self._find_name(kwargs["name"])
+        else:
+            index = next(iter(self._filter(range(self.games_count), kwargs)), None)
+
+        if index is None:
+            raise ModelNotFoundException
+        return self._game_record(index, counts)
+
+    def get_filtered_list(
+            self,
+            model_cls: Type[Entity],
+            start: int = 0,
+            limit: int = None,
+            order_by="-name",
+            connections: bool = False,
+            counts: Tuple[str, ...] = (),
+            **kwargs
+    ) -> Tuple[List[BaseModel], bool]:
+        if model_cls.__label__ != GameRecord.LABEL:
+            raise NotImplementedError
+
+        key, descending = order_by.lstrip("-"), order_by.startswith("-")
+        date_filters = {lookup: value for lookup, value in kwargs.items() if lookup.startswith("date__")}
+        filters = {lookup: value for lookup, value in kwargs.items() if lookup not in date_filters}
+
+        if key == "date" or date_filters:
+            indexes = self._get_date_range(date_filters)
+            if key == "date" and not date_filters:
+                indexes = self._reversed(indexes, self.dated_count) if descending else indexes
+            elif key == "date":
+                indexes = indexes[::-1] if descending else indexes
+            elif key == "name":
+                indexes = sorted(indexes, key=self._get_name, reverse=descending)
+            else:
+                raise ValueError(f"No such sort {order_by} in the snapshot")
+        elif key == "name":
+            indexes = self._sections["name_order"]
+            indexes = indexes[::-1] if descending else indexes
+        else:
+            raise ValueError(f"No such sort {order_by} in the snapshot")
+
+        indexes = self._filter(indexes, filters) if filters else indexes
+        return self._get_page(indexes, start, limit, counts)
+
+    def get_similar_list(
+            self,
+            model_cls: Type[Entity],
+            name: str,
+            start: int = 0,
+            limit: int = None,
+            connections: bool = False,
+            counts: Tuple[str, ...] = (),
+    ):
+        base = self._find_name(name)
+        if base is None:
+            raise ModelNotFoundException
+
+        game_indptr, game_indices = self._sections["game_indptr"], self._sections["game_indices"]
+        entity_indptr, entity_indices = self._sections["entity_indptr"], self._sections["entity_indices"]
+
+        # a game scores one per pair of edges through a shared entity, as the paths of the Cypher version
+        scores = {}
+        for entity in game_indices[game_indptr[base]:game_indptr[base + 1]]:
+            for game in entity_indices[entity_indptr[entity]:entity_indptr[entity + 1]]:
+                if game != base:
+                    scores[game] = scores.get(game, 0) + 1
+
+        indexes = sorted(scores, key=lambda index: (-scores[index], self._get_name(index)))
+        return self._get_page(indexes, start, limit, counts)
+
+    def attach_connections(self, records: List[EntityRecord]) -> None:
+        # records of the snapshot are built from documents that already carry their connections
+        for record in records:
+            if record.connections is None:
+                index = self._find_id("game_ids", self.games_count, record.node_id)
+                record.connections = self._game_record(index).connections
+
+    def create_model(self, model_cls: Type[Entity], **kwargs) -> BaseModel:
+        raise NotImplementedError("The snapshot is read-only")
+
+    def delete_model(self, model_cls: Type[Entity], name: str):
+        raise NotImplementedError("The snapshot is read-only")
+
+    def close(self) -> None:
+        for section in self._sections.values():
+            section.release()
+        self._mmap.close()
+
+    def _get_page(self, indexes, start: int, limit: int = None, counts: Tuple[str, ...] = ()):
+        stop = start + limit + 1 if limit else None
+        page = list(islice(indexes, start, stop))
+        is_next = bool(limit) and len(page) > limit
+        return [self._game_record(index, counts) for index in page[:limit]], is_next
+
+    def _get_date_range(self, filters: dict):
+        dates, date_order = self._sections["dates"], self._sections["date_order"]
+        if not filters:
+            return date_order
+
+        low, high = 0, self.dated_count
+        dated = _Keys(date_order, dates, self.dated_count)
+        for lookup, value in filters.items():
+            operator = lookup.partition("__")[2]
+            if operator not in self.OPERATORS:
+                raise ValueError(f"No such operator {operator}")
+            packed = value.year * 10000 + value.month * 100 + value.day
+            if operator == "gt":
+                low = max(low, bisect_right(dated, packed))
+            elif operator == "gte":
+                low = max(low, bisect_left(dated, packed))
+            elif operator == "lt":
+                high = min(high, bisect_left(dated, packed))
+            else:
+                high = min(high, bisect_right(dated, packed))
+        return date_order[low:max(low, high)]
+
+    @staticmethod
+    def _reversed(date_order, dated_count: int):
+        # dated games newest first, then the undated ones in name order
+        yield from date_order[:dated_count][::-1]
+        yield from date_order[dated_count:]
+
+    def _filter(self, indexes, filters: dict):
+        for index in indexes:
+            document = self._get_document("game", index)
+            if all(document.get(key) == value for key, value in filters.items()):
+                yield index
+
+    def _find_id(self, section: str, count: int, node_id: str):
+        if not node_id:
+            return None
+        ids, key = self._sections[section], node_id.encode().ljust(SnapshotService.ID_SIZE, b"\x00")
+        index = bisect_left(_Ids(ids, count), key)
+        if index < count and ids[index * SnapshotService.ID_SIZE:(index + 1) * SnapshotService.ID_SIZE] == key:
+            return index
+        return None
+
+    def _find_name(self, name: str):
+        names = _Keys(self._sections["name_order"], _Names(self), self.games_count)
+        position = bisect_left(names, name)
+        if position < self.games_count and names[position] == name:
+            return self._sections["name_order"][position]
+        return None
+
+    def _get_name(self, index: int) -> str:
+        offsets = self._sections["name_offsets"]
+        return bytes(self._sections["names"][offsets[index]:offsets[index + 1]]).decode()
+
+    def _get_document(self, kind: str, index: int) -> dict:
+        offsets = self._sections[f"{kind}_offsets"]
+        return json.loads(bytes(self._sections[f"{kind}_documents"][offsets[index]:offsets[index + 1]]))
+
+    def _game_record(self, index: int, counts: Tuple[str, ...] = ()) -> GameRecord:
+        record = GameRecord.from_document(self._get_document("game", index))
+        if counts:
+            record.counts = {
+                key: sum(
+                    len(record.connections[connection_key])
+                    for connection_key, relation_type, _ in record.CONNECTIONS
+                    if relation_type in record.COUNTS[key]
+                ) for key in counts
+            }
+        return record
+
+    def _entity_record(self, index: int, counts: Tuple[str, ...] = ()) -> EntityRecord:
+        document = self._get_document("entity", index)
+        record = RECORDS_BY_LABEL[document.pop("label")].from_document(document)
+        if counts:
+            indptr = self._sections["entity_indptr"]
+            record.counts = {key: indptr[index + 1] - indptr[index] for key in counts}
+        return record
+
+
+class _Keys:
+    """Sequence view of keys[order[i]] for bisect."""
+
+    def __init__(self, order, keys, count: int):
+        self.order, self.keys, self.count = order, keys, count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, position: int):
+        return self.keys[self.order[position]]
+
+
+class _Ids:
+    def __init__(self, ids, count: int):
+        self.ids, self.count = ids, count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index: int) -> bytes:
+        return bytes(self.ids[index * SnapshotService.ID_SIZE:(index + 1) * SnapshotService.ID_SIZE])
+
+
+class _Names:
+    def __init__(self, backend: SnapshotBackend):
+        self.backend = backend
+
+    def __getitem__(self, index: int) -> str:
+        return self.backend._get_name(index)
+
+
+if __name__ == "__main__":
+    import sys
+
+    from config import get_neo4j_url, get_neo4j_read_urls
+    from services.database_services import DatabaseService
+
+    DatabaseService.configure(get_neo4j_url(), get_neo4j_read_urls())
+    SnapshotService.export(sys.argv[1])
@@ -0,0 +1,109 @@
+import logging
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple, Type
+
+from flask import Flask
+from flask_restful import Resource
+from werkzeug.utils import import_string
+
+from services.database_services import DatabaseService
+
+logger = logging.getLogger(__name__)
+
+
+def lazy_resource(path: str) -> Type[Resource]:
+    """
+    Resource importing the one at path ("package.module.Class") on its first request,
+    so a worker does not import every resource module before serving.
+    """
+    class LazyResource(Resource):
+        resource = None
+
+        def dispatch_request(self, *args, **kwargs):
+            if LazyResource.resource is None:
+                LazyResource.resource = import_string(path)
+            return LazyResource.resource().dispatch_request(*args, **kwargs)
+
+    LazyResource.__name__ = path.rpartition(".")[2]
+    return LazyResource
+
+
+class StartupService:
+    """Preloading, warm-up and measurement of the app boot."""
+    PROFILE_LIMIT = 25
+
+    @staticmethod
+    def preload(routes: Dict[str, str]) -> None:
+        """
+        Imports every resource before the workers are forked (gunicorn --preload),
+        the modules and the read-only data loaded by create_app are then shared by the workers.
+        The inherited database connections are dropped in every forked process,
+        the document store drops its own ones.
+        """
+        for path in routes.values():
+            import_string(path)
+        os.register_at_fork(after_in_child=DatabaseService.reset_connections)
+
+    @staticmethod
+    def warm_up(app: Flask, paths: List[str]) -> None:
+        """
+        Serves paths once, so the first real request finds imports, parsers and caches ready.
+        Stops at the first failing path, the app still starts.
+        """
+        client = app.test_client()
+        for path in paths:
+            started = time.perf_counter()
+            try:
+                status = client.get(path).status_code
+            except Exception:
+                logger.exception("Warming up %s failed", path)
+                return
+            logger.info("Warmed up %s: %s in %.1f ms", path, status, (time.perf_counter() - started) * 1000)
+            if status >= 500:
+                return
+
+    @staticmethod
+    def profile_imports(module: str = "app") -> List[Tuple[str, int, int]]:
+        """
+        (module, self us, cumulative us) of importing module in a fresh interpreter,
+        as reported by python -X importtime, the most expensive first.
+        """
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True, text=True, check=True
+        )
+        imports = []
+        for line in process.stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            imports.append((name.strip(), int(self_us), int(cumulative_us)))
+        return sorted(imports, key=lambda row: row[2], reverse=True)
+
+    @staticmethod
+    def profile_boot(module: str = "app") -> Dict[str, float]:
+        """Milliseconds spent importing module and running its create_app in a fresh interpreter."""
+        code = f"import time; started = time.perf_counter(); import {module}; imported = time.perf_counter(); " \
+               f"{module}.create_app(); print(imported - started, time.perf_counter() - imported)"
+        process = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        imported, created = (float(value) * 1000 for value in process.stdout.split()[-2:])
+        return {"import_ms": imported, "create_app_ms": created, "boot_ms": imported + created}
+
+    @staticmethod
+    def report(module: str = "app", limit: int = PROFILE_LIMIT) -> str:
+        lines = [f"{'cumulative ms':>14} {'self ms':>8}  module"]
+        for name, self_us, cumulative_us in StartupService.profile_imports(module)[:limit]:
+            lines.append(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>8.1f}  {name}")
+        boot = StartupService.profile_boot(module)
+        lines.append(
+            f"import {boot['import_ms']:.1f} ms, create_app {boot['create_app_ms']:.1f} ms, "
+            f"boot {boot['boot_ms']:.1f} ms"
+        )
+        return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    print(StartupService.report(*sys.argv[1:2]))
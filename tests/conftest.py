@@ -23,3 +23,88 @@ def neo4j(timeout=DEFAULT_TIMEOUT):
 
 def assert_url_is_http(url):
     assert re.match(r"^https?://", url)
+
+
+def make_payload(name, **kwargs):
+    payload = {
+        "name": name,
+        "short_desc": "desc",
+        "long_desc": "also desc",
+        "header_image": "https://example.com/image",
+    }
+    payload.update(kwargs)
+    return payload
+
+
+def make_document(counter, genres, date_=None):
+    return {
+        "name": f"game-{counter}",
+        "node_id": f"{counter:032x}",
+        "connections": {
+            "genres": [{"name": genre, "node_id": f"{genre:0>32}"} for genre in genres],
+            "categories": [],
+            "developers": [],
+            "publishers": [],
+            "dlcs": [],
+        },
+        "is_free": counter % 2 == 0,
+        "long_desc": "also desc",
+        "short_desc": "desc",
+        "date": date_,
+        "header_image": "https://example.com/image",
+        "images": [],
+        "movies": [],
+    }
+
+
+class FakeDb:
+    """Stands in for the neomodel db: logs transactions and queries, a query of UNWIND $rows returns their ids."""
+
+    def __init__(self, bookmark="bookmark:2"):
+        self.bookmark = bookmark
+        self._active_transaction = None
+        self.calls = []
+
+    def begin(self, access_mode=None, **parameters):
+        self.calls.append(("begin", access_mode, parameters))
+        self._active_transaction = object()
+
+    def commit(self):
+        self.calls.append(("commit",))
+        self._active_transaction = None
+        return self.bookmark
+
+    def rollback(self):
+        self.calls.append(("rollback",))
+        self._active_transaction = None
+
+    def cypher_query(self, cypher, params=None):
+        self.calls.append(("cypher_query", cypher, params))
+        return [[row.get("node_id")] for row in params["rows"]], ["n.node_id"]
+
+
+class FakeSession:
+    def __init__(self, driver, **parameters):
+        self.driver = driver
+        self.parameters = parameters
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def read_transaction(self, work):
+        self.driver.sessions.append(self.parameters)
+        return [[1]], ["n"]
+
+    def last_bookmark(self):
+        return "bookmark:3"
+
+
+class FakeDriver:
+    def __init__(self):
+        self.sessions = []
+
+    def session(self, **parameters):
+        return FakeSession(self, **parameters)
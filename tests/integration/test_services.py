@@ -1,3 +1,5 @@
+from datetime import date
+
 import pytest
 
 from models.category import Category
@@ -98,3 +100,97 @@ class TestModelService:
         assert len(results) == len(similar_names)
         for similar in results[:len(similar_names)]:
             assert similar
+
+    def test_create_many(self):
+        genres_names = ["test_genre1"]
+        payloads = [{
+            "name": f"batched-{counter % 5}",
+            "short_desc": "desc",
+            "long_desc": "also desc",
+            "header_image": "https://example.com/image",
+            "date": "23 Aug, 2016",
+            "genres": genres_names,
+        } for counter in range(10)]
+
+        node_ids = ModelService.create_many(Game, payloads, batch_size=3)
+
+        try:
+            assert len(node_ids) == len(payloads)
+            assert node_ids[:5] == node_ids[5:]
+
+            results, _ = ModelService.get_filtered_list(Genre, name=genres_names[0])
+            assert len(results) == 1
+
+            instance = ModelService.get_model(Game, connections=True, node_id=node_ids[0])
+            assert instance.get_formatted_date() == payloads[0]["date"]
+            assert [genre.name for genre in instance.connections["genres"]] == genres_names
+        finally:
+            for payload in payloads[:5]:
+                ModelService.delete_model(Game, payload["name"])
+            for name in genres_names:
+                ModelService.delete_model(Genre, name)
+
+    def test_date_range_and_timeline(self):
+        dates = ["23 Aug, 2016", "1 Sep, 2016", "5 Jan, 2018", None]
+        names = [f"dated-{counter}" for counter in range(len(dates))]
+        ModelService.create_many(Game, [{
+            "name": name,
+            "short_desc": "desc",
+            "long_desc": "also desc",
+            "header_image": "https://example.com/image",
+            "date": date_,
+        } for name, date_ in zip(names, dates)])
+
+        try:
+            results, _ = ModelService.get_filtered_list(
+                Game, order_by="date", date__gte=date(2016, 8, 1), date__lte=date(2016, 12, 31)
+            )
+            assert [result.name for result in results] == names[:2]
+
+            results, is_next = ModelService.get_filtered_list(Game, order_by="-date", start=0, limit=10)
+            dated = [result for result in results if result.date]
+            assert dated == results[:len(dated)]
+
+            timeline, undated = ModelService.get_timeline(Game, period="year")
+            counts = {row["period"]: row["count"] for row in timeline}
+            assert counts["2016"] >= 2
+            assert counts["2018"] >= 1
+            assert undated >= 1
+        finally:
+            for name in names:
+                ModelService.delete_model(Game, name)
+
+    def test_related_list(self):
+        game = ModelService.create_model(Game, **{
+            "name": "game-with-dlcs",
+            "short_desc": "desc",
+            "long_desc": "also desc",
+            "header_image": "https://example.com/image",
+        })
+        payloads = [{
+            "name": f"dlc-{counter}",
+            "short_desc": "desc",
+            "long_desc": "also desc",
+            "header_image": "https://example.com/image",
+            "games": [game.name],
+        } for counter in range(3)]
+        # both write paths connect a DLC to its games
+        dlcs = [ModelService.create_model(DLC, **payloads[0])]
+        dlcs += [
+            ModelService.get_model(DLC, node_id=node_id) for node_id in ModelService.create_many(DLC, payloads[1:])
+        ]
+
+        try:
+            results, is_next = ModelService.get_related_list(
+                Game, game.node_id, DLC, limit=2, connections=True
+            )
+            assert [result.name for result in results] == ["dlc-0", "dlc-1"]
+            assert is_next
+            assert results[0].connections["games"][0].node_id == game.node_id
+
+            instance = ModelService.get_model(Game, counts=("dlc_count",), node_id=game.node_id)
+            assert instance.serialize()["dlc_count"] == len(dlcs)
+        finally:
+            for dlc in dlcs:
+                ModelService.delete_model(DLC, dlc.name)
+            ModelService.delete_model(Game, game.name)
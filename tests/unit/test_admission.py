@@ -0,0 +1,63 @@
+import pytest
+
+from app import BOOKMARK_HEADER, create_app
+from services.admission_services import AdmissionService, TokenBucket
+from services.model_services import ModelService
+from services.snapshot_services import SnapshotService
+from tests.conftest import make_document
+
+
+@pytest.mark.order(1)
+class TestAdmission:
+    @pytest.fixture(autouse=True)
+    def limits(self):
+        AdmissionService.configure({
+            "GameSimilarResource": {"rate": 1, "burst": 2, "concurrency": 1},
+            "GameListResource": {"rate": 1, "burst": 5, "offset_cost": 100},
+        })
+
+        yield
+
+        AdmissionService.configure({})
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(rate=2, burst=2)
+        assert bucket.take() == 0
+        assert bucket.take() == 0
+        assert 0 < bucket.take() <= 0.5
+
+    def test_concurrency(self):
+        assert AdmissionService.admit("GameSimilarResource") is None
+        assert AdmissionService.admit("GameSimilarResource") == (AdmissionService.OVERLOADED, 1)
+
+        AdmissionService.release("GameSimilarResource")
+        assert AdmissionService.admit("GameSimilarResource") is None
+        assert AdmissionService.get_stats()["GameSimilarResource"] == {
+            "served": 2, "rate_limited": 0, "overloaded": 1
+        }
+
+    def test_cost(self):
+        cost = AdmissionService.get_cost("GameListResource", start=400)
+        assert cost == 5
+        assert AdmissionService.admit("GameListResource", cost) is None
+        assert AdmissionService.admit("GameListResource") == (AdmissionService.RATE_LIMITED, 1)
+
+    def test_unlimited(self):
+        assert AdmissionService.get_cost("GameDetailResource", start=1000) == 1
+        assert all(AdmissionService.admit("GameDetailResource") is None for _ in range(100))
+
+    def test_rejection_without_previous_bookmark(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "catalogue.snapshot")
+        SnapshotService.write(path, [make_document(1, ["a"])])
+        monkeypatch.setenv("SNAPSHOT_PATH", path)
+        previous = ModelService.backend
+        client = create_app().test_client()
+        AdmissionService.configure({"GameListResource": {"rate": 0.001, "burst": 1}})
+
+        assert client.get("/games", headers={BOOKMARK_HEADER: "bookmark:1"}).headers[BOOKMARK_HEADER] == "bookmark:1"
+        response = client.get("/games")
+        assert response.status_code == 429
+        assert BOOKMARK_HEADER not in response.headers
+
+        ModelService.backend.close()
+        ModelService.use_backend(previous)
@@ -0,0 +1,115 @@
+import pytest
+
+from services.cache_services import EntityCache, ListCache, LocalSharedCache, LRUCache
+from services.event_services import EventService
+
+
+@pytest.mark.order(1)
+class TestListCache:
+    @pytest.fixture
+    def cache(self):
+        cache_ = ListCache()
+
+        yield cache_
+
+        EventService.unsubscribe(cache_.invalidate_event)
+
+    def test_cached(self, cache):
+        loads = []
+        for _ in range(3):
+            cache.get_or_load("genres", ["Genre"], lambda: loads.append(1) or [1, 2])
+        assert len(loads) == 1
+
+    def test_expired(self, cache):
+        cache.ttl = -1
+        loads = []
+        for _ in range(3):
+            cache.get_or_load("genres", ["Genre"], lambda: loads.append(1) or [1, 2])
+        assert len(loads) == 3
+
+    def test_invalidated_by_event(self, cache):
+        loads = []
+        cache.get_or_load("genres", ["Genre"], lambda: loads.append(1) or [1, 2])
+        cache.get_or_load("categories", ["Category"], lambda: loads.append(1) or [1, 2])
+
+        EventService.publish(EventService.CREATE, "Game", "abc", "test_game", [("GENRE_OF", "Genre", "test_genre")])
+        cache.get_or_load("genres", ["Genre"], lambda: loads.append(1) or [1, 2])
+        cache.get_or_load("categories", ["Category"], lambda: loads.append(1) or [1, 2])
+
+        assert len(loads) == 3
+
+
+@pytest.mark.order(1)
+class TestLRUCache:
+    def test_evicts_least_recent(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get_stats() == {"size": 2, "hits": 2, "misses": 1, "hit_rate": 2 / 3}
+
+
+@pytest.mark.order(1)
+class TestEntityCache:
+    GENRE = {"node_id": "g", "name": "test_genre"}
+
+    @pytest.fixture
+    def cache(self):
+        cache_ = EntityCache(size=10, shared=LocalSharedCache())
+
+        yield cache_
+
+        EventService.unsubscribe(cache_.invalidate_event)
+
+    def test_shared(self, cache):
+        cache.set_many({"g": self.GENRE}, "Genre")
+        cache.local.clear()
+
+        assert cache.get_many(["g", "missing"]) == {"g": self.GENRE}
+        assert cache.get_stats()["l2"]["hits"] == 1
+        assert cache.get_many(["g"]) == {"g": self.GENRE}
+        assert cache.get_stats()["l1"]["hits"] == 1
+
+    def test_invalidated_by_event(self, cache):
+        cache.set_many({"g": self.GENRE}, "Genre")
+        EventService.publish(EventService.DELETE, "Game", "abc", "test_game", [("GENRE_OF", "Genre", "test_genre")])
+
+        assert cache.get_many(["g"]) == {}
+
+    def test_outdated_load_skipped(self, cache):
+        def loader(node_ids):
+            # a write lands while the value is loaded
+            EventService.publish(EventService.CREATE, "Genre", "g", "test_genre")
+            return {"g": self.GENRE}
+
+        assert cache.get_or_load_many(["g"], "Genre", loader) == {"g": self.GENRE}
+        assert cache.get_many(["g"]) == {}
+
+    def test_expired(self, cache):
+        cache.set_many({"g": self.GENRE}, "Genre")
+        cache.ttl = -1
+
+        assert cache.get_many(["g"]) == {}
+
+    def test_off_by_default(self):
+        cache = EntityCache()
+        cache.set_many({"g": self.GENRE}, "Genre")
+
+        assert not cache.enabled
+        assert cache.get_many(["g"]) == {}
+        EventService.unsubscribe(cache.invalidate_event)
+
+    def test_bookkeeping_bounded(self, cache):
+        cache.set_many({f"g{counter}": {"name": f"genre-{counter}"} for counter in range(20)}, "Genre")
+        assert len(cache._names) == cache.local.maxsize
+        cache.invalidate(["g19"])
+        assert ("Genre", "genre-19") not in cache._names
+
+        cache.ttl = 0
+        cache.invalidate([f"g{counter}" for counter in range(20)])
+        cache.invalidate(["g0"])
+        assert len(cache._invalidated) <= 1
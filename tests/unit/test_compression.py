@@ -0,0 +1,52 @@
+import gzip
+
+import pytest
+from flask import Flask, request
+
+from services.compression_services import CompressionService
+
+
+@pytest.mark.order(1)
+class TestCompression:
+    BODY = {"results": [{"name": f"game-{counter}", "long_desc": "also desc " * 20} for counter in range(100)]}
+
+    @pytest.fixture
+    def client(self):
+        CompressionService.configure(threshold=1024, stream_threshold=10 * 1024, cache_size=4)
+        app = Flask(__name__)
+
+        @app.route("/small")
+        def small():
+            return {"result": "small"}
+
+        @app.route("/large")
+        def large():
+            return self.BODY
+
+        app.after_request(lambda response: CompressionService.compress_response(request, response))
+        yield app.test_client()
+
+        CompressionService.configure()
+
+    def test_negotiate(self):
+        assert CompressionService.negotiate("gzip, deflate") == "gzip"
+        assert CompressionService.negotiate("gzip;q=0, identity") is None
+        assert CompressionService.negotiate("*") == CompressionService.negotiate("br, gzip")
+        assert CompressionService.negotiate("") is None
+
+    def test_threshold(self, client):
+        response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in response.headers
+        assert response.headers["Vary"] == "Accept-Encoding"
+
+    def test_streamed_and_cached(self, client):
+        response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Content-Length" not in response.headers
+        body = gzip.decompress(response.get_data())
+        assert len(CompressionService.cache) == 1
+
+        response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+        assert "Content-Length" in response.headers
+        assert gzip.decompress(response.get_data()) == body
+        assert CompressionService.cache.get_stats()["hits"] == 1
@@ -0,0 +1,127 @@
+import pytest
+
+from models.game import Game
+from models.genre import Genre
+from services.backends.memory_backend import InMemoryBackend
+from services.cache_services import entity_cache
+from services.document_services import DocumentService, DocumentStore
+from services.event_services import EventService
+from services.model_services import ModelService
+
+
+@pytest.mark.order(1)
+class TestDocumentStore:
+    DOCUMENTS = [
+        {"node_id": "a", "name": "game-a", "connections": {"genres": []}},
+        {"node_id": "b", "name": "game-b", "connections": {"genres": []}},
+    ]
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        store_ = DocumentStore(str(tmp_path / "documents.sqlite"))
+        store_.put_many(self.DOCUMENTS)
+        return store_
+
+    def test_get_many(self, store):
+        documents = store.get_many(["a", "b", "missing"])
+        assert set(documents) == {"a", "b"}
+
+    def test_replace(self, store):
+        store.put_many([{"node_id": "a", "name": "game-a", "connections": {"genres": [1]}}])
+        assert '"genres": [1]' in store.get_many(["a"])["a"]
+
+    def test_delete(self, store):
+        store.delete_many(node_ids=["a"], names=["game-b"])
+        assert store.get_many(["a", "b"]) == {}
+
+    def test_reset_connection(self, store):
+        connection = store._connection
+        store.reset_connection()
+
+        assert store._connection is not connection
+        assert set(store.get_many(["a", "b"])) == {"a", "b"}
+
+
+@pytest.mark.order(1)
+class TestCachedDocuments:
+    @pytest.fixture(autouse=True)
+    def backend(self):
+        previous = ModelService.backend
+        ModelService.use_backend(InMemoryBackend())
+        entity_cache.configure(100)
+        ModelService.create_model(Game, **{
+            "name": "test_game",
+            "short_desc": "desc",
+            "long_desc": "also desc",
+            "header_image": "https://example.com/image",
+            "genres": ["test_genre"],
+        })
+
+        yield
+
+        entity_cache.configure()
+        ModelService.use_backend(previous)
+
+    def test_assembled_from_parts(self):
+        records, _ = ModelService.get_filtered_list(Game)
+        document = DocumentService.get_documents(records)[0]
+        assert document["connections"]["genres"][0]["name"] == "test_genre"
+
+        genre = document["connections"]["genres"][0]
+        assert DocumentService.get_document(document["node_id"]) == document
+        assert DocumentService.get_document(document["node_id"])["connections"]["genres"][0] is genre
+
+    def test_invalidated_by_write(self):
+        records, _ = ModelService.get_filtered_list(Game)
+        node_id = DocumentService.get_documents(records)[0]["node_id"]
+
+        ModelService.delete_model(Genre, "test_genre")
+        assert DocumentService.get_document(node_id)["connections"]["genres"] == []
+
+    def test_cache_off(self):
+        entity_cache.configure()
+        records, _ = ModelService.get_filtered_list(Game)
+        document = DocumentService.get_documents(records)[0]
+
+        assert document["connections"]["genres"][0]["name"] == "test_genre"
+        assert DocumentService.get_document(document["node_id"]) == document
+        assert len(entity_cache.local) == 0
+
+
+@pytest.mark.order(1)
+class TestStoredDocuments:
+    GAME = {
+        "name": "test_game",
+        "short_desc": "desc",
+        "long_desc": "also desc",
+        "header_image": "https://example.com/image",
+        "genres": ["test_genre"],
+    }
+
+    @pytest.fixture(autouse=True)
+    def backend(self, tmp_path):
+        previous = ModelService.backend
+        ModelService.use_backend(InMemoryBackend())
+        DocumentService.configure(str(tmp_path / "documents.sqlite"))
+
+        yield
+
+        EventService.unsubscribe(DocumentService.update)
+        DocumentService.store = None
+        ModelService.use_backend(previous)
+
+    def test_dropped_by_write(self, monkeypatch):
+        node_ids = ModelService.create_many(Game, [self.GAME, dict(self.GAME, name="other_game")])
+        records, _ = ModelService.get_filtered_list(Game)
+        DocumentService.get_documents(records)
+        assert set(DocumentService.store.get_many(node_ids)) == set(node_ids)
+
+        reads = []
+        monkeypatch.setattr(ModelService, "get_model", staticmethod(lambda *args, **kwargs: reads.append(1)))
+        ModelService.create_many(Game, [dict(self.GAME, genres=["other_genre"])])
+
+        assert reads == []
+        assert set(DocumentService.store.get_many(node_ids)) == {node_ids[1]}
+        monkeypatch.undo()
+        genres = DocumentService.get_document(node_ids[0])["connections"]["genres"]
+        assert {genre["name"] for genre in genres} == {"test_genre", "other_genre"}
@@ -0,0 +1,45 @@
+import pytest
+
+from services.event_services import BasePublisher, EventService
+
+
+@pytest.mark.order(1)
+class TestEventService:
+    @pytest.fixture
+    def events(self):
+        events_ = []
+        EventService.subscribe(events_.append)
+
+        yield events_
+
+        EventService.unsubscribe(events_.append)
+
+    def test_publish(self, events):
+        relationships = [("GENRE_OF", "Genre", "test_genre")]
+        event = EventService.publish(EventService.CREATE, "Game", "abc", "test_game", relationships)
+
+        assert events == [event]
+        assert event.relationships == tuple(relationships)
+        assert event.serialize()["relationships"] == [list(relationships[0])]
+
+    def test_versions_increase(self, events):
+        for counter in range(3):
+            EventService.publish(EventService.DELETE, "Genre", str(counter), f"genre-{counter}")
+
+        versions = [event.version for event in events]
+        assert versions == sorted(versions)
+        assert len(set(versions)) == len(versions)
+
+    def test_failing_publisher(self, events):
+        class FailingPublisher(BasePublisher):
+            def publish(self, event):
+                raise RuntimeError
+
+        publisher = FailingPublisher()
+        EventService.add_publisher(publisher)
+        try:
+            EventService.publish(EventService.CREATE, "Genre", "abc", "test_genre")
+        finally:
+            EventService.remove_publisher(publisher)
+
+        assert len(events) == 1
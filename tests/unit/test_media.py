@@ -0,0 +1,77 @@
+import pytest
+
+from models.game import Game
+from services import database_services, media_services
+from services.backends.memory_backend import InMemoryBackend
+from services.database_services import DatabaseService
+from services.event_services import EventService
+from services.media_services import MediaService
+from tests.conftest import FakeDb
+
+IMAGE = "https://cdn.akamai.steamstatic.com/steam/apps/440/ss_1.jpg"
+MOVIE = "http://cdn.akamai.steamstatic.com/steam/apps/256/movie480.mp4"
+
+
+@pytest.mark.order(1)
+class TestMediaService:
+    def test_compact(self):
+        assert MediaService.compact(IMAGE) == "steam:440/ss_1.jpg"
+        assert MediaService.compact(MOVIE) == "steamvideo:256/movie480.mp4"
+        assert MediaService.compact("https://example.com/image") == "https://example.com/image"
+        assert MediaService.compact(IMAGE) is MediaService.compact(IMAGE[:])
+
+    def test_expand(self):
+        assert MediaService.expand("steam:440/ss_1.jpg") == IMAGE
+        assert MediaService.expand("https://example.com/image") == "https://example.com/image"
+
+    def test_expand_document(self):
+        document = {
+            "header_image": "steam:440/header.jpg",
+            "images": ["steam:440/ss_1.jpg"],
+            "movies": [],
+            "connections": {"dlcs": [{"images": ["steamvideo:256/movie480.mp4"]}]},
+        }
+        expanded = MediaService.serialize([document], "url")[0]
+
+        assert expanded["images"] == [IMAGE]
+        assert expanded["connections"]["dlcs"][0]["images"] == [MOVIE]
+        assert document["images"] == ["steam:440/ss_1.jpg"]
+        assert MediaService.serialize([document], "id")[0] is document
+
+    def test_stored_compact(self):
+        backend = InMemoryBackend()
+        backend.create_model(
+            Game, name="test_game", short_desc="desc", long_desc="also desc",
+            header_image=IMAGE, images=[IMAGE], movies=[MOVIE]
+        )
+        document = backend.get_model(Game, name="test_game").serialize()
+
+        assert document["images"] == ["steam:440/ss_1.jpg"]
+        sizes = MediaService.measure([document])
+        assert sizes["id_bytes"] < sizes["url_bytes"]
+
+    def test_migrate_publishes_events(self, monkeypatch):
+        batches = [
+            [
+                [1, ["Entity", "Content", "Game"], "g", "game", [], IMAGE, [IMAGE], []],
+                [2, ["Entity", "Content", "DLC"], "d", "dlc", ["game"], "steam:1/header.jpg", [], [MOVIE]],
+                [3, ["Entity", "Content", "DLC"], "c", "compact", [], "steam:1/header.jpg", [], []],
+            ],
+            [],
+        ]
+        db = FakeDb()
+        monkeypatch.setattr(database_services, "db", db)
+        monkeypatch.setattr(media_services, "db", db)
+        monkeypatch.setattr(DatabaseService, "read_query", staticmethod(lambda *args: (batches.pop(0), [])))
+        events = []
+        EventService.subscribe(events.append)
+        try:
+            stats = MediaService.migrate()
+        finally:
+            EventService.unsubscribe(events.append)
+            DatabaseService.set_bookmarks([])
+
+        assert stats["nodes"] == 2
+        assert [(event.model, event.node_id, event.relationships) for event in events] == [
+            ("Game", "g", ()), ("DLC", "d", (("DLC_OF", "Game", "game"),))
+        ]
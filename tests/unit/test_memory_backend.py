@@ -0,0 +1,160 @@
+from datetime import date
+
+import pytest
+
+from models.category import Category
+from models.company import Company
+from models.content import Content
+from models.dlc import DLC
+from models.entity import Entity
+from models.game import Game
+from models.genre import Genre
+from services.backends.memory_backend import InMemoryBackend
+from services.event_services import EventService
+from services.model_services import ModelService, ModelNotFoundException
+from tests.conftest import make_payload
+
+
+@pytest.mark.order(1)
+class TestInMemoryBackend:
+    @pytest.fixture(autouse=True)
+    def backend(self):
+        previous = ModelService.backend
+        backend = InMemoryBackend()
+        ModelService.use_backend(backend)
+        yield backend
+        ModelService.use_backend(previous)
+
+    @pytest.fixture
+    def instances(self):
+        return [
+            ModelService.create_model(Game, **make_payload(
+                f"entity-{counter}",
+                is_free=counter % 3 == 0,
+                genres=["test_genre1", "test_genre2"] if counter % 3 == 0 else [],
+                categories=["test_category1"] if counter % 3 == 0 else [],
+            )) for counter in range(10)
+        ]
+
+    def test_creation_no_duplicates(self):
+        instances = [ModelService.create_model(Entity, name="unique") for _ in range(3)]
+        assert len({instance.node_id for instance in instances}) == 1
+
+        results, _ = ModelService.get_filtered_list(Entity, name="unique")
+        assert len(results) == 1
+
+    def test_delete_shared_name(self):
+        # node ids are random, so both orders of the equal index keys are met
+        for _ in range(20):
+            ModelService.use_backend(InMemoryBackend())
+            ModelService.create_model(Game, **make_payload("X"))
+            dlc = ModelService.create_model(DLC, **make_payload("X"))
+            assert len(ModelService.get_filtered_list(Content, name="X")[0]) == 2
+
+            ModelService.delete_model(Game, "X")
+            results, _ = ModelService.get_filtered_list(Content, name="X")
+            assert [result.node_id for result in results] == [dlc.node_id]
+
+    def test_model_creation_sad(self):
+        for model_cls in (Game, DLC, Content):
+            with pytest.raises(TypeError):
+                ModelService.create_model(model_cls, name="test_name")
+
+    def test_get_model(self, instances):
+        instance = ModelService.get_model(Game, connections=True, node_id=instances[0].node_id)
+        assert instance.name == "entity-0"
+        assert [genre.name for genre in instance.connections["genres"]] == ["test_genre1", "test_genre2"]
+
+        with pytest.raises(ModelNotFoundException):
+            ModelService.get_model(Game, name="missing")
+
+    def test_filtered_list(self, instances):
+        results, is_next = ModelService.get_filtered_list(Game, is_free=True, limit=3)
+        assert [result.name for result in results] == ["entity-9", "entity-6", "entity-3"]
+        assert is_next
+
+        results, is_next = ModelService.get_filtered_list(Game, order_by="name", start=8, limit=5)
+        assert [result.name for result in results] == ["entity-8", "entity-9"]
+        assert not is_next
+
+    def test_date_range_and_timeline(self):
+        dates = ["23 Aug, 2016", "01 Sep, 2016", "05 Jan, 2018", None]
+        names = [f"dated-{counter}" for counter in range(len(dates))]
+        ModelService.create_many(Game, [make_payload(name, date=date_) for name, date_ in zip(names, dates)])
+
+        results, _ = ModelService.get_filtered_list(
+            Game, order_by="date", date__gte=date(2016, 8, 1), date__lte=date(2016, 12, 31)
+        )
+        assert [result.name for result in results] == names[:2]
+
+        results, _ = ModelService.get_filtered_list(Game, order_by="-date")
+        assert [result.name for result in results] == ["dated-2", "dated-1", "dated-0", "dated-3"]
+
+        timeline, undated = ModelService.get_timeline(Game, period="year")
+        assert timeline == [{"period": "2016", "count": 2}, {"period": "2018", "count": 1}]
+        assert undated == 1
+
+    def test_similar_list(self, instances):
+        results, is_next = ModelService.get_similar_list(Game, name="entity-0", limit=2)
+        assert [result.name for result in results] == ["entity-3", "entity-6"]
+        assert is_next
+
+    def test_similar_list_excludes_base(self):
+        ModelService.create_model(Game, **make_payload("base", developers=["studio"], publishers=["studio"]))
+        ModelService.create_model(Game, **make_payload("same_studio", developers=["studio"], genres=["genre"]))
+
+        results, _ = ModelService.get_similar_list(Game, name="base")
+        assert [result.name for result in results] == ["same_studio"]
+
+    def test_counts_and_related_list(self, instances):
+        results, _ = ModelService.get_filtered_list(Genre, order_by="-game_count", counts=("game_count",))
+        assert [(result.name, result.counts["game_count"]) for result in results] == [
+            ("test_genre1", 4), ("test_genre2", 4)
+        ]
+
+        results, _ = ModelService.get_related_list(Genre, results[0].node_id, Game, limit=2)
+        assert [result.name for result in results] == ["entity-0", "entity-3"]
+
+    def test_dlcs(self):
+        game = ModelService.create_model(Game, **make_payload("game"))
+        events = []
+        EventService.subscribe(events.append)
+        try:
+            dlc = ModelService.create_model(DLC, **make_payload("dlc", games=["game"]))
+        finally:
+            EventService.unsubscribe(events.append)
+
+        assert list(events[0].relationships) == [("DLC_OF", "Game", "game")]
+        results, _ = ModelService.get_related_list(Game, game.node_id, DLC)
+        assert [result.node_id for result in results] == [dlc.node_id]
+        results, _ = ModelService.get_related_list(DLC, dlc.node_id, Game)
+        assert [result.node_id for result in results] == [game.node_id]
+        game = ModelService.get_model(Game, counts=("dlc_count",), connections=True, node_id=game.node_id)
+        assert game.counts["dlc_count"] == 1
+        assert [connected.name for connected in game.connections["dlcs"]] == ["dlc"]
+
+        with pytest.raises(ModelNotFoundException):
+            ModelService.create_model(DLC, **make_payload("other_dlc", games=["missing"]))
+
+    def test_company_relationship_count(self):
+        ModelService.create_model(Game, **make_payload("game", developers=["studio"], publishers=["studio"]))
+        ModelService.create_model(DLC, **make_payload("dlc", developers=["studio"]))
+
+        company = ModelService.get_model(Company, counts=("relationship_count",), name="studio")
+        assert company.serialize()["relationship_count"] == 3
+
+    def test_delete_publishes_relationships(self, instances):
+        events = []
+        EventService.subscribe(events.append)
+        try:
+            ModelService.delete_model(Category, "test_category1")
+            ModelService.delete_model(Company, "missing")
+        finally:
+            EventService.unsubscribe(events.append)
+
+        assert len(events) == 1
+        assert sorted(name for _, _, name in events[0].relationships) == [
+            "entity-0", "entity-3", "entity-6", "entity-9"
+        ]
+        instance = ModelService.get_model(Game, connections=True, name="entity-0")
+        assert instance.connections["categories"] == []
@@ -0,0 +1,119 @@
+import pytest
+
+from models.company import Company
+from models.dlc import DLC
+from models.game import Game
+from services import database_services
+from services.backends import neo4j_backend
+from services.backends.base import ModelNotFoundException
+from services.backends.neo4j_backend import Neo4jBackend
+from services.database_services import DatabaseService
+from services.event_services import EventService
+from services.model_services import ModelService
+from tests.conftest import FakeDb, make_payload
+
+
+@pytest.mark.order(1)
+class TestNeo4jBackend:
+    @pytest.fixture
+    def fake_db(self, monkeypatch):
+        db = FakeDb()
+        monkeypatch.setattr(database_services, "db", db)
+        monkeypatch.setattr(neo4j_backend, "db", db)
+
+        yield db
+
+        DatabaseService.set_bookmarks([])
+
+    def test_merge_cypher(self):
+        # the text only, deduplication by a running MERGE is checked by the integration test_create_many
+        cypher = Neo4jBackend()._get_merge_cypher(Game)
+
+        # merged on the name alone, the other properties are set when the node is created
+        assert cypher.startswith(
+            "UNWIND $rows AS row MERGE (n:Game {name: row.name}) ON CREATE SET n:Content:Entity, "
+            "n.node_id = row.node_id, n += row.properties "
+        )
+        for key, label, relation_type in (
+                ("publishers", "Company", "PUBLISHED"),
+                ("developers", "Company", "DEVELOPED"),
+                ("genres", "Genre", "GENRE_OF"),
+                ("categories", "Category", "CATEGORY_OF"),
+        ):
+            assert f"FOREACH (related_name IN row.{key} | MERGE (related:{label} {{name: related_name}}) " \
+                   f"ON CREATE SET related:Entity, " in cypher
+            assert f"MERGE (n)-[:{relation_type}]->(related)) " in cypher
+        assert cypher.endswith("RETURN n.node_id")
+
+        cypher = Neo4jBackend()._get_merge_cypher(DLC)
+        assert "row.genres" not in cypher and "row.publishers" in cypher
+        # DLC_OF points from the game to its DLC
+        assert "FOREACH (related_name IN row.games | MERGE (related:Game {name: related_name}) " \
+               "MERGE (related)-[:DLC_OF]->(n)) " in cypher
+        assert "row.games" not in Neo4jBackend()._get_merge_cypher(Game)
+
+    def test_undated_marker(self, monkeypatch):
+        assert "FOREACH (_ IN CASE WHEN n.date IS NULL THEN [1] ELSE [] END | SET n:Undated) " \
+               in Neo4jBackend()._get_merge_cypher(Game)
+        assert "Undated" not in Neo4jBackend()._get_merge_cypher(Company)
+
+        queries = []
+
+        def read_query(cypher, params=None):
+            queries.append(cypher)
+            return ([[0]] if "count(n)" in cypher else []), []
+
+        monkeypatch.setattr(DatabaseService, "read_query", staticmethod(read_query))
+        Neo4jBackend().get_filtered_list(Game, order_by="date", limit=10)
+
+        # the undated tail reads the nodes of the marker label
+        assert queries[-1].startswith("MATCH (n:Game:Undated) WHERE n.date IS NULL RETURN n ORDER BY n.name ")
+
+    def test_label_sparse_nodes(self, fake_db, monkeypatch):
+        counts = [2, 1]
+        monkeypatch.setattr(fake_db, "cypher_query", lambda cypher, params: ([[counts.pop(0)]], ["count(n)"]))
+
+        assert Neo4jBackend().label_sparse_nodes(batch_size=2) == 3
+        assert counts == []
+
+    def test_create_many_missing_game(self, fake_db, monkeypatch):
+        monkeypatch.setattr(DatabaseService, "read_query", staticmethod(lambda *args: ([["game"]], ["n.name"])))
+        payloads = [make_payload("dlc", games=["game"]), make_payload("other_dlc", games=["missing"])]
+
+        with pytest.raises(ModelNotFoundException):
+            Neo4jBackend().create_many(DLC, payloads)
+        assert fake_db.calls == []
+
+    def test_create_many_batches(self, fake_db):
+        payloads = [make_payload(f"game-{counter}", genres=["test_genre"]) for counter in range(5)]
+        node_ids = Neo4jBackend().create_many(Game, payloads, batch_size=2)
+
+        queries = [call for call in fake_db.calls if call[0] == "cypher_query"]
+        assert [[row["name"] for row in params["rows"]] for _, _, params in queries] == [
+            ["game-0", "game-1"], ["game-2", "game-3"], ["game-4"]
+        ]
+        assert [call[0] for call in fake_db.calls] == ["begin", "cypher_query", "commit"] * 3
+        assert node_ids == [row["node_id"] for _, _, params in queries for row in params["rows"]]
+        assert queries[0][2]["rows"][0]["genres"] == ["test_genre"]
+
+    def test_create_many_failing_batch(self, fake_db, monkeypatch):
+        cypher_query = fake_db.cypher_query
+
+        def fail_second_batch(cypher, params=None):
+            if params["rows"][0]["name"] == "game-2":
+                raise RuntimeError("write failed")
+            return cypher_query(cypher, params)
+
+        monkeypatch.setattr(fake_db, "cypher_query", fail_second_batch)
+        monkeypatch.setattr(ModelService, "backend", Neo4jBackend())
+        events = []
+        EventService.subscribe(events.append)
+        try:
+            with pytest.raises(RuntimeError):
+                ModelService.create_many(Game, [make_payload(f"game-{counter}") for counter in range(4)], 2)
+        finally:
+            EventService.unsubscribe(events.append)
+
+        # the first batch is committed, so its events are out
+        assert [event.name for event in events] == ["game-0", "game-1"]
+        assert fake_db.calls[-1] == ("rollback",)
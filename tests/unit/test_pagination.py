@@ -86,3 +86,18 @@ class TestPagination:
         )
 
         assert len(result.get("results")) == len(list_) - start
+
+    def test_url_params(self):
+        list_ = self.generate_list()
+
+        result = PaginationService.get_paginated_list(
+            PaginationService.trim_list(list_, 10, 10),
+            self.TEST_URL,
+            True,
+            10,
+            10,
+            params={"sort": "-date", "released_after": "2016-01-01"}
+        )
+
+        assert result.get("next").endswith("&sort=-date&released_after=2016-01-01")
+        assert result.get("previous").endswith("&sort=-date&released_after=2016-01-01")
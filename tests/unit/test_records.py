@@ -0,0 +1,57 @@
+import pytest
+
+from models.records import GameRecord, GenreRecord, DLCRecord, EntityRecord, get_record_class
+
+
+class FakeNode(dict):
+    def __init__(self, id_, labels, **properties):
+        super().__init__(**properties)
+        self.id = id_
+        self.labels = frozenset(labels)
+
+
+@pytest.mark.order(1)
+class TestRecords:
+    NODE = FakeNode(
+        1, ["Entity", "Content", "Game"],
+        node_id="abc", name="test_game", is_free=False,
+        short_desc="short description", long_desc="Detailed description.",
+        date="2016-08-23", header_image="https://test.url",
+        images=["https://test.url/image1.jepeh"], movies=[],
+    )
+
+    def test_record_class_by_labels(self):
+        assert get_record_class(self.NODE.labels) is GameRecord
+        assert get_record_class(["Entity", "Content", "DLC"]) is DLCRecord
+        assert get_record_class(["Unknown"]) is EntityRecord
+
+    def test_slots(self):
+        record = GameRecord.from_node(self.NODE)
+        assert not hasattr(record, "__dict__")
+
+    def test_serialize(self):
+        record = GameRecord.from_node(self.NODE)
+        serialization = record.serialize()
+
+        assert serialization["node_id"] == "abc"
+        assert serialization["date"] == "23 Aug, 2016"
+        assert serialization["images"] == self.NODE["images"]
+        assert "connections" not in serialization
+
+    def test_serialize_connections(self):
+        record = GameRecord.from_node(self.NODE)
+        with pytest.raises(ValueError):
+            record.serialize(connections=True)
+
+        record.connections = {"genres": [GenreRecord(node_id="g", name="genre")]}
+        connections = record.serialize(connections=True)["connections"]
+
+        assert connections["genres"] == [{"name": "genre", "node_id": "g"}]
+        assert connections["dlcs"] == []
+
+    def test_from_document(self):
+        record = GameRecord.from_node(self.NODE)
+        record.connections = {"dlcs": [DLCRecord.from_node(FakeNode(2, ["DLC"], node_id="d", name="dlc"))]}
+        document = record.serialize(connections=True)
+
+        assert GameRecord.from_document(document).serialize(connections=True) == document
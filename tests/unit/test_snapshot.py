@@ -0,0 +1,69 @@
+from datetime import date
+
+import pytest
+
+from models.game import Game
+from models.genre import Genre
+from services.model_services import ModelNotFoundException
+from services.snapshot_services import SnapshotBackend, SnapshotService
+from tests.conftest import make_document
+
+
+@pytest.mark.order(1)
+class TestSnapshot:
+    DOCUMENTS = [
+        make_document(0, ["a", "b"], "23 Aug, 2016"),
+        make_document(1, ["a", "b"], "1 Sep, 2016"),
+        make_document(2, ["a"], "05 Jan, 2018"),
+        make_document(3, ["c"]),
+        make_document(4, []),
+    ]
+
+    @pytest.fixture
+    def backend(self, tmp_path):
+        path = str(tmp_path / "catalogue.snapshot")
+        SnapshotService.write(path, self.DOCUMENTS)
+        backend_ = SnapshotBackend(path)
+
+        yield backend_
+
+        backend_.close()
+
+    def test_get_model(self, backend):
+        document = self.DOCUMENTS[2]
+        by_id = backend.get_model(Game, node_id=document["node_id"])
+        by_name = backend.get_model(Game, name=document["name"])
+
+        assert by_id.serialize(connections=True) == document
+        assert by_name.node_id == document["node_id"]
+        with pytest.raises(ModelNotFoundException):
+            backend.get_model(Game, node_id="missing")
+
+    def test_get_entity(self, backend):
+        genre = backend.get_model(Genre, counts=("game_count",), node_id=f"{'a':0>32}")
+        assert genre.serialize() == {"name": "a", "node_id": f"{'a':0>32}", "game_count": 3}
+
+    def test_filtered_list(self, backend):
+        results, is_next = backend.get_filtered_list(Game, start=1, limit=2, order_by="-name")
+        assert [result.name for result in results] == ["game-3", "game-2"]
+        assert is_next
+
+        results, _ = backend.get_filtered_list(Game, order_by="name", is_free=True)
+        assert [result.name for result in results] == ["game-0", "game-2", "game-4"]
+
+    def test_date_order_and_range(self, backend):
+        results, _ = backend.get_filtered_list(Game, order_by="-date")
+        assert [result.name for result in results] == ["game-2", "game-1", "game-0", "game-3", "game-4"]
+
+        results, _ = backend.get_filtered_list(
+            Game, order_by="date", date__gte=date(2016, 8, 23), date__lt=date(2018, 1, 5)
+        )
+        assert [result.name for result in results] == ["game-0", "game-1"]
+
+    def test_similar_list(self, backend):
+        results, is_next = backend.get_similar_list(Game, name="game-0", limit=1)
+        assert [result.name for result in results] == ["game-1"]
+        assert is_next
+
+        results, _ = backend.get_similar_list(Game, name="game-0")
+        assert [result.name for result in results] == ["game-1", "game-2"]
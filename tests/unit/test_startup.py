@@ -0,0 +1,50 @@
+import pytest
+from flask import Flask
+from flask_restful import Api
+
+from services.startup_services import StartupService, lazy_resource
+
+
+@pytest.mark.order(1)
+class TestStartup:
+    def test_lazy_resource(self):
+        app = Flask(__name__)
+        api = Api(app)
+        resource = lazy_resource("resources.entity.list.GenreListResource")
+        api.add_resource(resource, "/genres", endpoint="genres")
+
+        assert resource.resource is None
+        assert app.test_client().get("/genres?sort=unknown").status_code == 400
+        assert resource.resource.__name__ == "GenreListResource"
+
+    def test_games_sort_choices(self):
+        app = Flask(__name__)
+        Api(app).add_resource(lazy_resource("resources.game.list.GameListResource"), "/games")
+
+        assert app.test_client().get("/games?sort=bogus").status_code == 400
+
+    def test_entity_games_sort_choices(self):
+        app = Flask(__name__)
+        Api(app).add_resource(
+            lazy_resource("resources.entity.games.CompanyGameListResource"), "/companies/<string:node_id>/games"
+        )
+
+        for sort in ("bogus", "dlc_count"):
+            assert app.test_client().get(f"/companies/abc/games?sort={sort}").status_code == 400
+
+    def test_profile_imports(self):
+        imports = StartupService.profile_imports("json")
+        assert "json" in [name for name, _, _ in imports]
+        assert imports[0][2] >= imports[-1][2]
+
+    def test_warm_up_stops_at_failure(self):
+        app = Flask(__name__)
+        served = []
+
+        @app.route("/<name>")
+        def serve(name):
+            served.append(name)
+            return "", 500 if name == "broken" else 200
+
+        StartupService.warm_up(app, ["/a", "/broken", "/b"])
+        assert served == ["a", "broken"]